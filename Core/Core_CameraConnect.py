@@ -13,6 +13,72 @@ SSH_CAMERA_USER = "pi"
 CAMERA_IP = None
 ZMQ_ADDR = None
 
+# nslookup "Address: x.x.x.x" lines
+_ADDR_RE = re.compile(r"Address:\s+(\d+\.\d+\.\d+\.\d+)")
+
+# Single algorithm suite offered to the camera (Pi OpenSSH supports all three),
+# so the handshake does not negotiate across paramiko's full preference lists.
+# Everything else is disabled by name (fixed list; names a given paramiko
+# release does not know are simply ignored)
+CAMERA_SSH_KEX = "ecdh-sha2-nistp256"
+CAMERA_SSH_CIPHER = "aes128-ctr"
+CAMERA_SSH_MAC = "hmac-sha2-256"
+_CAMERA_SSH_DISABLED = {
+    "kex": [
+        "curve25519-sha256@libssh.org",
+        "ecdh-sha2-nistp384",
+        "ecdh-sha2-nistp521",
+        "diffie-hellman-group16-sha512",
+        "diffie-hellman-group-exchange-sha256",
+        "diffie-hellman-group14-sha256",
+        "diffie-hellman-group-exchange-sha1",
+        "diffie-hellman-group14-sha1",
+        "diffie-hellman-group1-sha1",
+    ],
+    "ciphers": [
+        "aes192-ctr",
+        "aes256-ctr",
+        "aes128-cbc",
+        "aes192-cbc",
+        "aes256-cbc",
+        "3des-cbc",
+        "aes128-gcm@openssh.com",
+        "aes256-gcm@openssh.com",
+        "chacha20-poly1305@openssh.com",
+    ],
+    "macs": [
+        "hmac-sha2-512",
+        "hmac-sha2-256-etm@openssh.com",
+        "hmac-sha2-512-etm@openssh.com",
+        "hmac-sha1",
+        "hmac-md5",
+        "hmac-sha1-96",
+        "hmac-md5-96",
+    ],
+}
+
+
+def connect_camera_client(client, hostname, timeout=5):
+    """
+    Connect an SSHClient to the camera using the pinned algorithm suite.
+    Falls back to normal negotiation if the camera does not offer it.
+    """
+    try:
+        client.connect(
+            hostname=hostname,
+            username=SSH_CAMERA_USER,
+            timeout=timeout,
+            disabled_algorithms=_CAMERA_SSH_DISABLED,
+        )
+    except (paramiko.AuthenticationException, paramiko.BadHostKeyException):
+        # Not a negotiation problem - a second connect would fail the same way
+        raise
+    except (paramiko.SSHException, TypeError):
+        # Suite not offered by the camera (or paramiko too old for
+        # disabled_algorithms): retry with normal negotiation
+        client.close()
+        client.connect(hostname=hostname, username=SSH_CAMERA_USER, timeout=timeout)
+
 class CoreCameraConnect(QObject):
     """
     Complete camera connection manager - exact port of original tkinter code.
@@ -28,35 +94,78 @@ class CoreCameraConnect(QObject):
         super().__init__()
         self.camera_ip = None
         self.zmq_addr = None
+        self._lan_ip = None  # Cached by get_lan_ip()
+        
+        # Long-lived router SSH clients keyed by (host, user) - reused across detections
+        self._ssh_clients = {}
+        self._ssh_lock = threading.Lock()
+
+    def _get_client(self, hostname, username, password=None, timeout=5):
+        """Return a cached SSH client for host/user, reconnecting if the transport dropped."""
+        key = (hostname, username)
+        client = self._ssh_clients.get(key)
+        if client is not None:
+            transport = client.get_transport()
+            if transport is not None and transport.is_active():
+                return client
+            client.close()
+        
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        client.connect(
+            hostname=hostname,
+            username=username,
+            password=password,
+            timeout=timeout,
+        )
+        self._ssh_clients[key] = client
+        return client
+
+    def _drop_client(self, hostname, username):
+        """Close and forget a cached client so the next call reconnects."""
+        client = self._ssh_clients.pop((hostname, username), None)
+        if client is not None:
+            client.close()
 
     def get_lan_ip(self):
-        """Get local LAN IP (exact original)."""
+        """Get local LAN IP (cached after the first successful lookup)."""
+        if self._lan_ip is not None:
+            return self._lan_ip
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             s.connect(("8.8.8.8", 80))
             ip = s.getsockname()[0]
             s.close()
+            self._lan_ip = ip
             return ip
         except Exception:
             return "Unknown"
 
+    def invalidate_lan_ip(self):
+        """Forget the cached LAN IP (e.g. after a network change)."""
+        self._lan_ip = None
+
     def detect_camera_ip(self):
         """Detect camera IP via router (EXACT original logic)."""
+        # New detection may mean a new network - re-read LAN IP on next connect
+        self.invalidate_lan_ip()
+        
         def run_detection():
             try:
-                client = paramiko.SSHClient()
-                client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                client.connect(
-                    hostname=SSH_ROUTER_IP,
-                    username=SSH_ROUTER_USER,
-                    password="admin",  # Original hardcoded
-                    timeout=5,
-                )
-                _, stdout, _ = client.exec_command("nslookup qbc.lan")
-                output = stdout.read().decode()
-                client.close()
-
-                ips = re.findall(r"Address:\s+(\d+\.\d+\.\d+\.\d+)", output)
+                with self._ssh_lock:
+                    try:
+                        client = self._get_client(
+                            SSH_ROUTER_IP,
+                            SSH_ROUTER_USER,
+                            password="admin",  # Original hardcoded
+                        )
+                        _, stdout, _ = client.exec_command("nslookup qbc.lan")
+                        output = stdout.read().decode()
+                    except Exception:
+                        self._drop_client(SSH_ROUTER_IP, SSH_ROUTER_USER)
+                        raise
+
+                ips = _ADDR_RE.findall(output)
 
                 if not ips:
                     raise RuntimeError("Camera IP not found in nslookup output")
@@ -76,10 +185,15 @@ class CoreCameraConnect(QObject):
         def run_ssh_check():
             global CAMERA_IP  # Match original global pattern
             try:
+                # Fresh connect-then-close on every check: the long-lived camera
+                # session belongs to CameraGainExposure, and a cached client here
+                # would skip the reachability test on reconnect
                 client = paramiko.SSHClient()
                 client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                client.connect(hostname=ip, username=SSH_CAMERA_USER, timeout=5)
-                client.close()
+                try:
+                    connect_camera_client(client, ip, timeout=5)
+                finally:
+                    client.close()
                 
                 self.camera_ip = ip
                 self.zmq_addr = f"tcp://{self.get_lan_ip()}:5555"
@@ -1,6 +1,16 @@
 from PySide6.QtCore import QObject, QThread, Signal, QMutex, Slot
+from PySide6.QtGui import QImage
 import paramiko, re, zmq, cv2, numpy as np
-from Core.Core_CameraConnect import SSH_CAMERA_USER
+import threading
+from bisect import bisect_left
+from Core.Core_CameraConnect import connect_camera_client
+from Core.Core_DisplayKernels import gray_to_rgb32_overexp
+
+# Optional SIMD JPEG decoder (falls back to cv2.imdecode when unavailable)
+try:
+    from turbojpeg import TurboJPEG, TJPF_GRAY
+except ImportError:
+    TurboJPEG = None
 
 # Globals (shared)
 gain_scales = []
@@ -12,6 +22,12 @@ FULL_W = FRAME_W * 4
 CAM_DEVICES = [0, 2, 4, 6]
 EXPO_ABS = [1, 2, 5, 10, 20, 39, 78, 156, 312, 625, 1250, 2500]
 EXPO_MS = [0.04, 0.15, 0.52, 1.08, 2.24, 4.48, 9.03, 18.14, 36.04, 72.99, 146.05, 292.21]
+# Exposure in ms*100 per level (filename encoding), rounded once
+EXPO_MS100 = [int(round(ms * 100)) for ms in EXPO_MS]
+# Midpoints between neighbouring EXPO_ABS values (nearest-level lookup)
+_EXPO_BOUNDS = [(a + b) / 2 for a, b in zip(EXPO_ABS[:-1], EXPO_ABS[1:])]
+# "D<dev>" marker followed by v4l2-ctl "<control>: <value>" output
+_CTRL_RE = re.compile(r"D(\d+)\s+\w+:\s+(\d+)")
 CAMERA_IP = None
 ZMQ_ADDR = None
 last_fullframe = None
@@ -20,45 +36,82 @@ last_fullframe = None
 class CameraGainExposure(QObject):
     status_updated = Signal(int, str, str)  # cam_idx, gain_str, expo_str
 
+    def __init__(self):
+        super().__init__()
+        # Long-lived SSH client to the camera (lazily connected, reused per query)
+        self._ssh = None
+        self._ssh_lock = threading.Lock()
+
     def set_camera_ip(self, ip):
         """Set global CAMERA_IP safely."""
         global CAMERA_IP
-        CAMERA_IP = ip
+        with self._ssh_lock:
+            if ip != CAMERA_IP:
+                self._close_client()
+            CAMERA_IP = ip
+
+    def _get_client(self, timeout=5):
+        """Return the cached SSH client, reconnecting if the transport dropped."""
+        client = self._ssh
+        if client is not None:
+            transport = client.get_transport()
+            if transport is not None and transport.is_active():
+                return client
+            client.close()
+            self._ssh = None
+
+        client = paramiko.SSHClient()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        connect_camera_client(client, CAMERA_IP, timeout=timeout)
+        self._ssh = client
+        return client
+
+    def _close_client(self):
+        """Close the cached SSH client (next query reconnects)."""
+        if self._ssh is not None:
+            self._ssh.close()
+            self._ssh = None
     
+    def _query_control(self, client, ctrl):
+        """
+        Read one v4l2 control from all CAM_DEVICES in a single exec_command.
+        Each device's output is prefixed with a "D<dev>" marker line so the
+        values can be recovered from the combined stdout.
+        Returns a list of ints (None where a device did not answer).
+        """
+        cmd = " ; ".join(f"echo D{dev}; v4l2-ctl -d{dev} -C {ctrl}" for dev in CAM_DEVICES)
+        _, stdout, _ = client.exec_command(cmd)
+        found = dict(_CTRL_RE.findall(stdout.read().decode()))
+        return [int(found[str(dev)]) if str(dev) in found else None for dev in CAM_DEVICES]
+
     def get_camera_gains(self):
         gains = [1] * 4 if CAMERA_IP is None else []
         try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(hostname=CAMERA_IP, username=SSH_CAMERA_USER, timeout=5)
-            for dev in CAM_DEVICES:
-                _, stdout, _ = client.exec_command(f"v4l2-ctl -d{dev} -C gain")
-                m = re.search(r"(\d+)", stdout.read().decode().strip())
-                gains.append(int(m.group(1)) if m else 1)
-            client.close()
+            with self._ssh_lock:
+                values = self._query_control(self._get_client(), "gain")
+            for val in values:
+                gains.append(val if val is not None else 1)
         except Exception as e:
             print("Gain query error:", e)
+            with self._ssh_lock:
+                self._close_client()
             gains = [1, 1, 1, 1]
         return gains
 
     def get_camera_exposures(self):
         levels = [1] * 4 if CAMERA_IP is None else []
         try:
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(hostname=CAMERA_IP, username=SSH_CAMERA_USER, timeout=5)
-            for dev in CAM_DEVICES:
-                _, stdout, _ = client.exec_command(f"v4l2-ctl -d{dev} -C exposure_time_absolute")
-                m = re.search(r"(\d+)", stdout.read().decode().strip())
-                if m:
-                    val = int(m.group(1))
-                    diffs = [abs(val - ev) for ev in EXPO_ABS]
-                    levels.append(diffs.index(min(diffs)) + 1)
+            with self._ssh_lock:
+                values = self._query_control(self._get_client(), "exposure_time_absolute")
+            for val in values:
+                if val is not None:
+                    levels.append(bisect_left(_EXPO_BOUNDS, val) + 1)
                 else:
                     levels.append(1)
-            client.close()
         except Exception as e:
             print("Exposure query error:", e)
+            with self._ssh_lock:
+                self._close_client()
             levels = [1, 1, 1, 1]
         return levels
 
@@ -66,13 +119,13 @@ class CameraGainExposure(QObject):
         if CAMERA_IP is None: return
         try:
             dev = CAM_DEVICES[cam_index]
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(hostname=CAMERA_IP, username=SSH_CAMERA_USER, timeout=3)
-            client.exec_command(f"v4l2-ctl -d{dev} -c gain={gain_val}")
-            client.close()
+            with self._ssh_lock:
+                client = self._get_client(timeout=3)
+                client.exec_command(f"v4l2-ctl -d{dev} -c gain={gain_val}")
         except Exception as e:
             print("Gain set error:", e)
+            with self._ssh_lock:
+                self._close_client()
 
     def set_camera_expo(self, cam_index, level):
         if CAMERA_IP is None: return
@@ -80,13 +133,13 @@ class CameraGainExposure(QObject):
             level = max(1, min(12, level))
             expo_val = EXPO_ABS[level - 1]
             dev = CAM_DEVICES[cam_index]
-            client = paramiko.SSHClient()
-            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-            client.connect(hostname=CAMERA_IP, username=SSH_CAMERA_USER, timeout=3)
-            client.exec_command(f"v4l2-ctl -d{dev} -c exposure_time_absolute={expo_val}")
-            client.close()
+            with self._ssh_lock:
+                client = self._get_client(timeout=3)
+                client.exec_command(f"v4l2-ctl -d{dev} -c exposure_time_absolute={expo_val}")
         except Exception as e:
             print("Exposure set error:", e)
+            with self._ssh_lock:
+                self._close_client()
 
     @Slot(int, int)  # gain_slider.value(), expo_slider.value()
     def update_status_label(self, cam_index, g, level):
@@ -101,6 +154,26 @@ class ZMQReceiverThread(QThread):
         super().__init__()
         self.zmq_addr = zmq_addr
         self.mutex = QMutex()
+        
+        self._tj = None
+        if TurboJPEG is not None:
+            try:
+                self._tj = TurboJPEG()
+            except Exception as e:
+                print("TurboJPEG unavailable, using cv2.imdecode:", e)
+
+    def decode_frame(self, data):
+        """
+        Decode one grayscale frame; JPEG goes through TurboJPEG when available.
+        Decoding stays on the CPU: cv2.imdecode has no OpenCL (T-API) path, a
+        UMat input is downloaded and decoded by the same CPU codec.
+        """
+        if self._tj is not None and data[:2] == b"\xff\xd8":
+            try:
+                return self._tj.decode(data, pixel_format=TJPF_GRAY)[:, :, 0]
+            except Exception:
+                return None
+        return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
 
     def run(self):
         context = zmq.Context()
@@ -108,13 +181,184 @@ class ZMQReceiverThread(QThread):
         sock.setsockopt(zmq.CONFLATE, 1)
         sock.bind(self.zmq_addr)
         sock.setsockopt_string(zmq.SUBSCRIBE, "")
+        
+        # Block in poll() until a frame arrives (timeout only to check interruption)
+        poller = zmq.Poller()
+        poller.register(sock, zmq.POLLIN)
         while not self.isInterruptionRequested():
-            try:
-                data = sock.recv(flags=zmq.NOBLOCK)
-                img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_GRAYSCALE)
-                if img is not None and img.shape == (FRAME_H, FULL_W):
-                    self.frame_received.emit(img.copy())
-            except zmq.Again:
-                self.msleep(10)
+            if sock not in dict(poller.poll(50)):
+                continue
+            
+            # Drain any backlog and keep only the freshest frame
+            data = None
+            while True:
+                try:
+                    data = sock.recv(flags=zmq.NOBLOCK)
+                except zmq.Again:
+                    break
+            if data is None:
+                continue
+            
+            # Both decoders return a freshly allocated array per frame, so it
+            # can be handed to the GUI thread as-is (no defensive copy)
+            img = self.decode_frame(data)
+            if img is not None and img.shape == (FRAME_H, FULL_W):
+                self.frame_received.emit(img)
         sock.close()
         context.term()
+
+
+class FrameConverterThread(QThread):
+    """
+    Converts full frames into 4 display QImages off the GUI thread.
+    
+    Single-slot hand-off: submit() replaces any frame that has not been
+    picked up yet, so a slow conversion drops stale frames instead of
+    queueing them. Emitted QImages are already fitted to the requested
+    display sizes.
+    
+    The QImages wrap persistent per-band buffers that are overwritten in
+    place; the receiver must call release() once it has taken its pixmaps,
+    and no new frame is converted before that.
+    
+    Submitted frames are only read, never kept: submit() returns the pending
+    frame it replaced and release() the frame just converted, so the caller
+    can recycle pooled frame buffers once the converter no longer holds them.
+    """
+    images_ready = Signal(list)  # 4 QImages (Grayscale8 or RGB32), valid until release()
+
+    def __init__(self):
+        super().__init__()
+        self._cond = threading.Condition()
+        self._pending = None
+        self._in_flight = False
+        self._current = None  # Frame picked up for conversion, until release()
+        # Packed RGB32 scratch per band (full tile, before resizing)
+        self._rgb_buf = [np.empty((FRAME_H, FRAME_W), dtype=np.uint32) for _ in range(4)]
+        # (band, format) -> (shape, buffer, QImage wrapping the buffer)
+        self._slots = {}
+
+    def submit(self, frame, sizes=None):
+        """
+        Hand over the latest full frame (must not be modified afterwards).
+        
+        Args:
+            frame: Full camera frame (480 x 2560)
+            sizes: Optional list of 4 (width, height) display sizes; each
+                tile is resized to fit its size with the aspect ratio kept
+        
+        Returns:
+            The previously pending frame that was dropped unconverted, or None
+        """
+        with self._cond:
+            dropped = self._pending[0] if self._pending is not None else None
+            self._pending = (frame, sizes)
+            self._cond.notify()
+        return dropped
+
+    def release(self):
+        """
+        Mark the last emitted images as consumed (buffers may be reused).
+        
+        Returns:
+            The frame those images were converted from, or None
+        """
+        with self._cond:
+            frame, self._current = self._current, None
+            self._in_flight = False
+            self._cond.notify()
+        return frame
+
+    def stop(self):
+        """Stop the worker and wait for it to finish."""
+        self.requestInterruption()
+        with self._cond:
+            self._cond.notify()
+        self.wait()
+
+    @staticmethod
+    def _fit_size(shape, size):
+        """(w, h) that fits a tile of shape into size keeping aspect, None if unchanged."""
+        h, w = shape[:2]
+        lw, lh = size
+        if lw <= 0 or lh <= 0:
+            return None
+        scale = min(lw / w, lh / h)
+        fit = (max(1, int(w * scale)), max(1, int(h * scale)))
+        return None if fit == (w, h) else fit
+
+    def _slot(self, band, fmt, shape, dtype):
+        """Persistent (buffer, QImage) for a band/format, reallocated on size change."""
+        key = (band, fmt)
+        slot = self._slots.get(key)
+        if slot is None or slot[0] != shape:
+            buf = np.empty(shape, dtype=dtype)
+            qimg = QImage(buf.data, shape[1], shape[0], buf.strides[0], fmt)
+            slot = self._slots[key] = (shape, buf, qimg)
+        return slot[1], slot[2]
+
+    def convert(self, frame, sizes=None):
+        """
+        Build one display QImage per band.
+        
+        Tiles without saturated pixels are shown as grey (Grayscale8); tiles
+        with a 255 get overexposure marked in red (RGB32). When sizes are
+        given, tiles are resized here (INTER_AREA when shrinking) so the GUI
+        thread does not have to scale them.
+        """
+        images = []
+        
+        # (H, 4*W) -> (4, H, W) band views (row stride stays 4*W; cv2 and the
+        # kernels read strided rows directly, so no per-band staging copy)
+        frame = np.ascontiguousarray(frame)
+        bands = frame.reshape(frame.shape[0], 4, FRAME_W).transpose(1, 0, 2)
+        
+        for i, tile in enumerate(bands):
+            fit = self._fit_size(tile.shape, sizes[i]) if sizes else None
+            interp = None
+            out_shape = tile.shape
+            if fit is not None:
+                interp = cv2.INTER_AREA if fit[0] < tile.shape[1] else cv2.INTER_LINEAR
+                out_shape = (fit[1], fit[0])
+            
+            if tile.max() < 255:
+                # Nothing to highlight -> grey tile as-is (no RGB expansion)
+                buf, qimg = self._slot(i, QImage.Format_Grayscale8, out_shape, np.uint8)
+                if fit is not None:
+                    cv2.resize(tile, fit, dst=buf, interpolation=interp)
+                else:
+                    np.copyto(buf, tile)
+            else:
+                # Grey -> RGB32 with overexposure highlighted in red (one pass)
+                buf, qimg = self._slot(i, QImage.Format_RGB32, out_shape, np.uint32)
+                if fit is not None:
+                    if self._rgb_buf[i].shape != tile.shape:
+                        self._rgb_buf[i] = np.empty(tile.shape, dtype=np.uint32)
+                    tile_rgb = gray_to_rgb32_overexp(tile, self._rgb_buf[i])
+                    # Resize the 4 bytes of each packed pixel as BGRA channels
+                    h, w = tile_rgb.shape
+                    cv2.resize(
+                        tile_rgb.view(np.uint8).reshape(h, w, 4), fit,
+                        dst=buf.view(np.uint8).reshape(fit[1], fit[0], 4), interpolation=interp
+                    )
+                else:
+                    gray_to_rgb32_overexp(tile, buf)
+            
+            images.append(qimg)
+        
+        return images
+
+    def run(self):
+        while True:
+            with self._cond:
+                # Wait for a frame and for the receiver to release the buffers
+                while ((self._pending is None or self._in_flight)
+                        and not self.isInterruptionRequested()):
+                    self._cond.wait()
+                if self.isInterruptionRequested():
+                    return
+                (frame, sizes), self._pending = self._pending, None
+                self._in_flight = True
+                self._current = frame
+            
+            self.images_ready.emit(self.convert(frame, sizes))
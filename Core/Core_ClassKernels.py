@@ -0,0 +1,51 @@
+import numpy as np
+
+# Optional: Numba reads each label once and writes its palette color (or
+# black for invalid pixels) in one parallel pass. Falls back to NumPy
+# palette indexing plus a masked clear.
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _apply_palette_numba(label_map, palette, invalid, out):
+        h, w = label_map.shape
+        n = palette.shape[0]
+        for r in prange(h):
+            for c in range(w):
+                v = label_map[r, c]
+                if v == invalid:
+                    out[r, c, 0] = 0
+                    out[r, c, 1] = 0
+                    out[r, c, 2] = 0
+                else:
+                    k = v % n
+                    out[r, c, 0] = palette[k, 0]
+                    out[r, c, 1] = palette[k, 1]
+                    out[r, c, 2] = palette[k, 2]
+
+
+def apply_palette(label_map, palette, invalid, out):
+    """
+    Color a label map with a palette, invalid pixels black.
+    
+    Args:
+        label_map: integer label map (H, W)
+        palette: uint8 color table (N, 3); label l gets palette[l % N]
+        invalid: label value of unclassified pixels
+        out: preallocated C-contiguous uint8 output (H, W, 3)
+    
+    Returns:
+        out
+    """
+    if HAVE_NUMBA:
+        _apply_palette_numba(label_map, palette, label_map.dtype.type(invalid), out)
+    else:
+        idx = np.remainder(label_map, len(palette), dtype=np.intp)
+        np.take(palette, idx, axis=0, out=out)
+        out[label_map == invalid] = 0
+    return out
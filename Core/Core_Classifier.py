@@ -1,8 +1,18 @@
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, QThread, Signal
 import numpy as np
 import joblib
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Label map value for pixels that were not classified (non-finite features).
+# Class labels are assumed to be non-negative integers.
+INVALID_LABEL = -1
+
+# Row-parallel predict (tree models release the GIL while predicting):
+# split into one chunk per core once there are at least this many rows
+PREDICT_PARALLEL_MIN_ROWS = 50000
 
 class CoreClassifier(QObject):
     """Handles machine learning model loading and classification."""
@@ -13,17 +23,55 @@ class CoreClassifier(QObject):
         super().__init__()
         self.model = None
         self.model_path = None
+        # Print load/prediction diagnostics to the console
+        self.verbose = False
+        # Thread pool for row-chunked predict (created on first use)
+        self._predict_pool = None
+        self._predict_workers = os.cpu_count() or 1
     
-    def load_model(self, filepath):
+    def load_model(self, filepath, verbose=None):
         """
-        Load a joblib classification model with detailed error reporting.
+        Load a joblib classification model.
+        
+        NumPy arrays inside the pickle are memory-mapped read-only from the
+        file, so the .joblib file must stay on disk while the model is in use.
         
         Args:
             filepath: Path to .joblib model file
+            verbose: Run the full diagnostic load (defaults to self.verbose)
             
         Returns:
             bool: True if successful, False otherwise
         """
+        if verbose is None:
+            verbose = self.verbose
+        if verbose:
+            return self._load_verbose(filepath)
+        return self._load_fast(filepath)
+    
+    def _load_fast(self, filepath):
+        """Load model with minimal validation (no diagnostics)."""
+        if not os.path.exists(filepath):
+            print(f"❌ File not found: {filepath}")
+            return False
+        
+        try:
+            model = joblib.load(filepath, mmap_mode='r')
+        except Exception as e:
+            print(f"❌ Model load failed: {type(e).__name__}: {e}")
+            print("   Load with verbose=True for a full diagnostic")
+            return False
+        
+        if not hasattr(model, 'predict'):
+            print("❌ INVALID MODEL: loaded object has no 'predict' method")
+            return False
+        
+        self.model = model
+        self.model_path = filepath
+        return True
+    
+    def _load_verbose(self, filepath):
+        """Load model with detailed diagnostic output and error reporting."""
         print("\n" + "="*60)
         print("🔍 MODEL LOADING DIAGNOSTIC")
         print("="*60)
@@ -63,7 +111,7 @@ class CoreClassifier(QObject):
         print(f"\n🔄 Attempting to load model...")
         
         try:
-            self.model = joblib.load(filepath)
+            self.model = joblib.load(filepath, mmap_mode='r')
             
         except ModuleNotFoundError as e:
             print(f"\n❌ MISSING PACKAGE")
@@ -131,7 +179,7 @@ class CoreClassifier(QObject):
         print(f"\n🧪 Testing prediction...")
         try:
             n_features = getattr(self.model, 'n_features_in_', 3)
-            X_test = np.random.rand(1, n_features)
+            X_test = np.zeros((1, n_features), dtype=np.float32)
             print(f"   Test input shape: {X_test.shape}")
             
             y_pred = self.model.predict(X_test)
@@ -148,15 +196,42 @@ class CoreClassifier(QObject):
         print("="*60 + "\n")
         return True
     
-    def predict_classification(self, feature_stack):
+    def _predict_rows(self, X):
+        """
+        Run model.predict over the rows of X, in parallel row chunks when useful.
+        
+        Only used for tree models (single trees and ensembles), whose predict
+        releases the GIL, and only when the model does not already run its
+        own jobs (n_jobs > 1 or -1); everything else gets one predict call.
+        """
+        model = self.model
+        is_tree = hasattr(model, "estimators_") or hasattr(model, "tree_")
+        own_jobs = getattr(model, "n_jobs", None) not in (None, 1)
+        n_chunks = min(self._predict_workers, len(X) // PREDICT_PARALLEL_MIN_ROWS)
+        
+        if not is_tree or own_jobs or n_chunks < 2:
+            return model.predict(X)
+        
+        if self._predict_pool is None:
+            self._predict_pool = ThreadPoolExecutor(max_workers=self._predict_workers)
+        
+        chunks = np.array_split(X, n_chunks)
+        results = list(self._predict_pool.map(model.predict, chunks))
+        return np.concatenate(results)
+    
+    def predict_classification(self, feature_stack, image_shape=None):
         """
         Predict classification map using loaded model.
         
         Args:
-            feature_stack: numpy array of shape (num_features, H, W)
+            feature_stack: numpy array of shape (num_features, H, W), or a
+                sample matrix (H*W, num_features) already laid out for predict
+            image_shape: (H, W) of the image, required for a sample matrix
         
         Returns:
-            label_map: numpy array of shape (H, W) with class labels
+            label_map: integer array of shape (H, W) with class labels
+                (smallest of int8/int16/int32 that holds them); unclassified
+                pixels are INVALID_LABEL
         """
         if self.model is None:
             print("❌ No model loaded")
@@ -167,16 +242,26 @@ class CoreClassifier(QObject):
             return None
         
         try:
-            num_features, H, W = feature_stack.shape
             print(f"\n🔧 Prediction starting...")
             print(f"   Feature stack shape: {feature_stack.shape}")
             
-            # Reshape to (H*W, num_features)
-            X = feature_stack.reshape(num_features, -1).T
-            print(f"   Reshaped to: {X.shape}")
+            if feature_stack.ndim == 2:
+                # Sample matrix built by the caller - used as-is (no copy if
+                # already C-contiguous float32)
+                H, W = image_shape
+                X = np.ascontiguousarray(feature_stack, dtype=np.float32)
+            else:
+                # Reshape to (H*W, num_features) - the transposed view is strided,
+                # so materialise it once as C-contiguous float32 (transpose + cast
+                # in one copy) instead of letting the model copy it internally
+                num_features, H, W = feature_stack.shape
+                X = np.ascontiguousarray(feature_stack.reshape(num_features, -1).T, dtype=np.float32)
+                print(f"   Reshaped to: {X.shape}")
             
-            # Create valid pixel mask
-            valid_mask = np.all(np.isfinite(X), axis=1)
+            # Create valid pixel mask - a row is valid only if every feature is
+            # finite (no NaN or inf). A row-sum shortcut is not used: a float32 sum
+            # of large finite ratio values can overflow to inf
+            valid_mask = np.isfinite(X).all(axis=1)
             num_valid = np.sum(valid_mask)
             print(f"   Valid pixels: {num_valid:,} / {len(valid_mask):,} ({100*num_valid/len(valid_mask):.1f}%)")
             
@@ -184,23 +269,35 @@ class CoreClassifier(QObject):
                 print("❌ No valid pixels to classify")
                 return None
             
-            # Predict only on valid pixels
+            # Predict only on valid pixels; the boolean gather is a full copy
+            # of X, so skip it when nothing is masked out
+            all_valid = num_valid == len(valid_mask)
             print(f"   Running model.predict()...")
-            y_pred = self.model.predict(X[valid_mask])
+            y_pred = self._predict_rows(X if all_valid else X[valid_mask])
             print(f"   Prediction complete!")
             
-            # Initialize result map with NaN
-            label_map = np.full((H * W), np.nan)
-            label_map[valid_mask] = y_pred
+            # Initialize result map with the invalid sentinel, in the most
+            # compact signed dtype (display/legend/save passes scan it again)
+            y_min, y_max = y_pred.min(), y_pred.max()
+            label_dtype = np.int32
+            for dt in (np.int8, np.int16):
+                if np.iinfo(dt).min <= y_min and y_max <= np.iinfo(dt).max:
+                    label_dtype = dt
+                    break
+            if all_valid:
+                label_map = y_pred.astype(label_dtype)
+            else:
+                label_map = np.full(H * W, INVALID_LABEL, dtype=label_dtype)
+                label_map[valid_mask] = y_pred
             label_map = label_map.reshape(H, W)
             
-            # Summary
-            unique_classes = np.unique(y_pred)
+            # Summary (per-class counts in a single pass, only when verbose)
             print(f"✅ Classification successful!")
-            print(f"   Unique classes: {unique_classes}")
-            for cls in unique_classes:
-                count = np.sum(y_pred == cls)
-                print(f"   Class {cls}: {count:,} pixels ({100*count/num_valid:.1f}%)")
+            if self.verbose:
+                unique_classes, counts = np.unique(y_pred, return_counts=True)
+                print(f"   Unique classes: {unique_classes}")
+                for cls, count in zip(unique_classes, counts):
+                    print(f"   Class {cls}: {count:,} pixels ({100*count/num_valid:.1f}%)")
             
             return label_map
             
@@ -225,3 +322,52 @@ class CoreClassifier(QObject):
             info += f"\nClasses: {self.model.classes_}"
         
         return info
+
+
+class ClassificationThread(QThread):
+    """
+    Runs CoreClassifier.predict_classification off the GUI thread.
+    
+    One job at a time: submit() hands over the feature matrix, which the
+    caller must not modify until classified has been emitted for it.
+    """
+    classified = Signal(object, object)  # label_map (None on failure), tag
+    
+    def __init__(self, classifier):
+        super().__init__()
+        self.classifier = classifier
+        self._cond = threading.Condition()
+        self._job = None
+    
+    def submit(self, features, image_shape=None, tag=None):
+        """
+        Queue one prediction.
+        
+        Args:
+            features: feature stack or sample matrix (see predict_classification)
+            image_shape: (H, W) for a sample matrix
+            tag: passed back unchanged with the result
+        """
+        with self._cond:
+            self._job = (features, image_shape, tag)
+            self._cond.notify()
+    
+    def stop(self):
+        """Stop the worker and wait for it to finish."""
+        self.requestInterruption()
+        with self._cond:
+            self._cond.notify()
+        self.wait()
+    
+    def run(self):
+        while True:
+            with self._cond:
+                while self._job is None and not self.isInterruptionRequested():
+                    self._cond.wait()
+                if self.isInterruptionRequested():
+                    return
+                (features, image_shape, tag), self._job = self._job, None
+            
+            label_map = self.classifier.predict_classification(features, image_shape)
+            self.classified.emit(label_map, tag)
+
@@ -14,6 +14,62 @@ class CoreDarkNoiseEstimator(QObject):
     def __init__(self):
         super().__init__()
         self.bg_tiles = [None, None, None, None]
+        
+        # float32 (4, H, W) stack of bg_tiles for the reflectance pipeline,
+        # rebuilt only when a tile object is replaced (new image loaded)
+        self._bg_f32 = None
+        self._bg_f32_src = (None, None, None, None)
+        
+        # Per-tile RGB scratch, label-sized display buffers and the QImages
+        # wrapping them. QImage does not copy the buffer, so all are kept on self.
+        self._rgb_scratch = [None, None, None, None]
+        self._resized = [None, None, None, None]
+        self._qimg = [None, None, None, None]
+        # Tile currently rendered (grey->RGB + ROI box) into _rgb_scratch
+        self._rendered_src = [None, None, None, None]
+        
+        # Centre ROI (ys, xs, x1, y1, x2, y2) keyed by tile shape
+        self._roi_cache = {}
+    
+    def _center_roi(self, shape, win_size=100):
+        """Return cached centre ROI slices and bounds for a tile shape."""
+        roi = self._roi_cache.get(shape)
+        if roi is None:
+            h, w = shape
+            cx, cy = w // 2, h // 2
+            
+            # Calculate ROI bounds
+            x1 = max(0, cx - win_size // 2)
+            y1 = max(0, cy - win_size // 2)
+            x2 = min(w, cx + win_size // 2)
+            y2 = min(h, cy + win_size // 2)
+            
+            roi = (slice(y1, y2), slice(x1, x2), x1, y1, x2, y2)
+            self._roi_cache[shape] = roi
+        return roi
+    
+    def background_stack_f32(self):
+        """
+        Return the background tiles as one float32 (4, H, W) array.
+        
+        The cast is done once per loaded background; the source tiles are
+        held by reference so a replaced tile is detected by identity.
+        
+        Returns:
+            float32 array (4, H, W), or None if any tile is missing
+        """
+        if any(t is None for t in self.bg_tiles):
+            return None
+        if self._bg_f32 is None or any(a is not b for a, b in zip(self.bg_tiles, self._bg_f32_src)):
+            # Cast each tile straight into the float32 stack (no uint8
+            # np.stack intermediate); buffer reused while the shape holds
+            shape = (len(self.bg_tiles),) + self.bg_tiles[0].shape
+            if self._bg_f32 is None or self._bg_f32.shape != shape:
+                self._bg_f32 = np.empty(shape, dtype=np.float32)
+            for i, tile in enumerate(self.bg_tiles):
+                np.copyto(self._bg_f32[i], tile, casting='unsafe')
+            self._bg_f32_src = tuple(self.bg_tiles)
+        return self._bg_f32
     
     def auto_load_background(self, bg_entry, bg_labels):
         """
@@ -39,12 +95,16 @@ class CoreDarkNoiseEstimator(QObject):
                 print(f"Background folder not found: {bg_dir}")
                 return
             
-            candidates = [f for f in os.listdir(bg_dir) if f.lower().endswith(".png")]
-            if not candidates:
+            # First PNG found - stop scanning as soon as one matches
+            with os.scandir(bg_dir) as it:
+                bg_path = next(
+                    (e.path for e in it if e.name.lower().endswith(".png") and e.is_file()),
+                    None,
+                )
+            if bg_path is None:
                 print("No PNG files found in Background folder")
                 return
             
-            bg_path = os.path.join(bg_dir, candidates[0])
             # Normalize the full path as well
             bg_path = os.path.normpath(bg_path)
             
@@ -78,36 +138,48 @@ class CoreDarkNoiseEstimator(QObject):
                 continue
             
             h, w = tile.shape
-            win_size = 100
-            cx, cy = w // 2, h // 2
+            ys, xs, x1, y1, x2, y2 = self._center_roi(tile.shape)
             
-            # Calculate ROI bounds
-            x1 = max(0, cx - win_size // 2)
-            y1 = max(0, cy - win_size // 2)
-            x2 = min(w, cx + win_size // 2)
-            y2 = min(h, cy + win_size // 2)
+            # Clamped centre window is never empty for a loaded tile
+            mean_val = float(cv2.mean(tile[ys, xs])[0])
             
-            roi = tile[y1:y2, x1:x2]
+            # (Re)allocate scratch only when the tile shape changes
+            tile_rgb = self._rgb_scratch[i]
+            if tile_rgb is None or tile_rgb.shape[:2] != (h, w):
+                tile_rgb = np.empty((h, w, 3), dtype=np.uint8)
+                self._rgb_scratch[i] = tile_rgb
+                self._rendered_src[i] = None
             
-            if roi.size == 0:
-                mean_val = 0.0
-            else:
-                mean_val = float(np.mean(roi))
+            # Re-render only when a new tile was loaded (ROI is fixed per shape)
+            rerendered = self._rendered_src[i] is not tile
+            if rerendered:
+                # Draw rectangle on tile
+                cv2.cvtColor(tile, cv2.COLOR_GRAY2RGB, dst=tile_rgb)
+                cv2.rectangle(tile_rgb, (x1, y1), (x2 - 1, y2 - 1), (255, 0, 0), 2)  # Blue rectangle
+                self._rendered_src[i] = tile
             
-            # Draw rectangle on tile
-            tile_rgb = cv2.cvtColor(tile, cv2.COLOR_GRAY2RGB)
-            cv2.rectangle(tile_rgb, (x1, y1), (x2 - 1, y2 - 1), (255, 0, 0), 2)  # Blue rectangle
+            # Downsample to label size (keep aspect ratio) with OpenCV INTER_AREA
+            # instead of Qt's SmoothTransformation on the GUI thread
+            label_size = bg_labels[i].size()
+            scale = min(label_size.width() / w, label_size.height() / h)
+            tw, th = max(1, int(w * scale)), max(1, int(h * scale))
+            
+            resized = self._resized[i]
+            if resized is None or resized.shape[:2] != (th, tw):
+                resized = np.empty((th, tw, 3), dtype=np.uint8)
+                self._resized[i] = resized
+                self._qimg[i] = QImage(resized.data, tw, th, 3 * tw, QImage.Format_RGB888)
+                rerendered = True
+            if rerendered:
+                cv2.resize(tile_rgb, (tw, th), dst=resized, interpolation=cv2.INTER_AREA)
             
             # Convert to QPixmap and display
-            h_rgb, w_rgb = tile_rgb.shape[:2]
-            bytes_per_line = 3 * w_rgb
-            qimg = QImage(tile_rgb.data, w_rgb, h_rgb, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qimg).scaled(
-                bg_labels[i].size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            bg_labels[i].setPixmap(pixmap)
+            bg_labels[i].setPixmap(QPixmap.fromImage(self._qimg[i]))
             
             # Update entry field
             bg_cam_entries[i].setText(f"{mean_val:.2f}")
         
+        # Prepare the float32 stack now instead of on the first reflectance frame
+        self.background_stack_f32()
+        
         # print("✅ Background noise estimated")
@@ -0,0 +1,50 @@
+import cv2
+import numpy as np
+
+# Optional: Numba does grey -> RGB expansion and overexposure marking in one
+# parallel pass. Falls back to cvtColor + mask assignment.
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+# QImage.Format_RGB32 pixel values (0xffRRGGBB, native-endian uint32)
+OVEREXPOSED_RGB32 = np.uint32(0xFFFF0000)  # red
+_OPAQUE = np.uint32(0xFF000000)
+_GRAY_TO_RGB32 = np.uint32(0x00010101)
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _gray_to_rgb32_overexp_numba(tile, out):
+        h, w = tile.shape
+        for r in prange(h):
+            for c in range(w):
+                v = tile[r, c]
+                if v == 255:
+                    out[r, c] = OVEREXPOSED_RGB32
+                else:
+                    out[r, c] = _OPAQUE | (np.uint32(v) * _GRAY_TO_RGB32)
+
+
+def gray_to_rgb32_overexp(tile, out):
+    """
+    Expand a uint8 grey tile to packed RGB32, painting saturated (255) pixels red.
+
+    Args:
+        tile: uint8 grey image (H, W), may be a strided view
+        out: preallocated C-contiguous uint32 buffer (H, W) for
+            QImage.Format_RGB32 (one 32-bit store per pixel)
+
+    Returns:
+        out
+    """
+    if HAVE_NUMBA:
+        _gray_to_rgb32_overexp_numba(tile, out)
+    else:
+        # BGRA bytes == 0xAARRGGBB little-endian words, alpha = 255
+        h, w = tile.shape
+        cv2.cvtColor(tile, cv2.COLOR_GRAY2BGRA, dst=out.view(np.uint8).reshape(h, w, 4))
+        out[tile == 255] = OVEREXPOSED_RGB32
+    return out
@@ -2,7 +2,32 @@ from PySide6.QtCore import QObject, Signal
 import cv2
 import numpy as np
 import configparser
+import hashlib
+import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Diagnostics go through logging (DEBUG for per-call/per-frame messages) so
+# they cost nothing on the live path unless explicitly enabled
+logger = logging.getLogger(__name__)
+
+# Robust homography estimator: MAGSAC++ (OpenCV >= 4.5) converges in far fewer
+# iterations than classic RANSAC; older builds fall back to RANSAC
+HOM_METHOD = getattr(cv2, 'USAC_MAGSAC', cv2.RANSAC)
+
+# Automatic alignment detects features on a downscaled copy of each band
+# (rigid camera mount -> sub-pixel keypoints are not needed)
+DETECT_SCALE = 0.5
+
+# AKAZE detector response threshold (OpenCV default) and the number of
+# strongest keypoints kept per band; knnMatch cost is O(Nq * Nt)
+AKAZE_THRESHOLD = 0.001
+AKAZE_MAX_FEATURES = 1000
+
+# CLAHE applied to each band before detection - evens out the different
+# intensity distributions of the spectral bands so descriptors match better
+CLAHE_CLIP_LIMIT = 2.0
+CLAHE_TILE_GRID = (8, 8)
 
 class CoreGeoTransform(QObject):
     """
@@ -23,7 +48,22 @@ class CoreGeoTransform(QObject):
             'H_41': None
         }
         
-        self.akaze = cv2.AKAZE_create()
+        self.akaze = cv2.AKAZE_create(threshold=AKAZE_THRESHOLD)
+        self.detect_scale = DETECT_SCALE
+        self.max_features = AKAZE_MAX_FEATURES  # None = keep all
+        self.use_clahe = True
+        # OpenCV's Hamming BFMatcher runs a native SIMD popcount; a NumPy
+        # xor + popcount-LUT matcher materialises Nq x Nt x 61 byte temporaries
+        # and is an order of magnitude slower, so matching stays in OpenCV
+        self.bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
+        # Fixed-point remap tables per (homography, output size)
+        self._map_cache = {}
+        # align_all_bands output buffers per band, reused across frames
+        self._aligned_bufs = {}
+        # Band 1 (reference) features keyed by image content hash
+        self._ref_cache = {}
+        # Bands are independent and OpenCV releases the GIL -> detect/match in parallel
+        self._pool = ThreadPoolExecutor(max_workers=4)
         self.keypoints = {}
         self.descriptors = {}
         self.matches = {}
@@ -51,17 +91,18 @@ class CoreGeoTransform(QObject):
             if img is None:
                 self.error_occurred.emit(f"Band {i+1} image is None")
                 return None
-            
-            # Detect keypoints and compute descriptors
-            kp, desc = self.akaze.detectAndCompute(img, None)
-            
+        
+        # Detect keypoints and compute descriptors (all bands concurrently)
+        detections = list(self._pool.map(lambda img: self.akaze.detectAndCompute(img, None), images))
+        
+        for i, (kp, desc) in enumerate(detections):
             results[f'B{i+1}'] = {
                 'keypoints': kp,
                 'descriptors': desc,
                 'num_features': len(kp)
             }
             
-            print(f"🔍 Band {i+1}: {len(kp)} features detected")
+            logger.debug("🔍 Band %d: %d features detected", i + 1, len(kp))
         
         self.keypoints = results
         return results
@@ -78,28 +119,45 @@ class CoreGeoTransform(QObject):
         Returns:
             list: Good matches after ratio test
         """
-        # Use Hamming distance for binary descriptors (AKAZE)
-        bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
-        
         try:
-            # Find k=2 best matches
-            matches = bf.knnMatch(desc1, desc2, k=2)
+            # Find k=2 best matches (shared Hamming matcher, see __init__)
+            matches = self.bf.knnMatch(desc1, desc2, k=2)
             
             # Apply Lowe's ratio test
-            good_matches = []
-            for m_n in matches:
-                if len(m_n) == 2:
-                    m, n = m_n
-                    if m.distance < ratio_threshold * n.distance:
-                        good_matches.append(m)
+            good_matches = self._ratio_test(matches, ratio_threshold)
             
-            print(f"   ✓ {len(good_matches)} good matches (from {len(matches)} total)")
+            logger.debug("   ✓ %d good matches (from %d total)", len(good_matches), len(matches))
             return good_matches
             
         except Exception as e:
-            print(f"   ❌ Matching error: {e}")
+            logger.warning("   ❌ Matching error: %s", e)
             return []
     
+    def _ratio_test(self, matches, ratio_threshold=0.75):
+        """
+        Lowe's ratio test on knnMatch(k=2) output.
+        Distances are pulled into two float32 arrays and compared in one
+        vectorized step instead of per-pair Python comparisons.
+        
+        Returns:
+            list: Best DMatch of every pair that passes the test
+        """
+        pairs = [m_n for m_n in matches if len(m_n) == 2]
+        if not pairs:
+            return []
+        
+        d0 = np.fromiter((m_n[0].distance for m_n in pairs), dtype=np.float32, count=len(pairs))
+        d1 = np.fromiter((m_n[1].distance for m_n in pairs), dtype=np.float32, count=len(pairs))
+        keep = np.flatnonzero(d0 < ratio_threshold * d1)
+        return [pairs[k][0] for k in keep]
+    
+    def _match_indices(self, matches):
+        """Query/train keypoint indices of a DMatch list as two int32 arrays."""
+        n = len(matches)
+        qi = np.fromiter((m.queryIdx for m in matches), dtype=np.int32, count=n)
+        ti = np.fromiter((m.trainIdx for m in matches), dtype=np.int32, count=n)
+        return qi, ti
+    
     def calculate_homography(self, kp1, kp2, matches, min_matches=10):
         """
         Calculate homography matrix from matched keypoints.
@@ -114,26 +172,96 @@ class CoreGeoTransform(QObject):
             numpy.ndarray: 3x3 homography matrix or None
         """
         if len(matches) < min_matches:
-            print(f"   ❌ Insufficient matches: {len(matches)} < {min_matches}")
+            logger.debug("   ❌ Insufficient matches: %d < %d", len(matches), min_matches)
             return None
         
-        # Extract matched point coordinates
-        src_pts = np.float32([kp1[m.queryIdx].pt for m in matches]).reshape(-1, 1, 2)
-        dst_pts = np.float32([kp2[m.trainIdx].pt for m in matches]).reshape(-1, 1, 2)
+        # Extract matched point coordinates (one gather per keypoint set)
+        qi, ti = self._match_indices(matches)
+        src_pts = cv2.KeyPoint_convert(kp1)[qi]
+        dst_pts = cv2.KeyPoint_convert(kp2)[ti]
         
-        # Calculate homography using RANSAC
-        H, mask = cv2.findHomography(dst_pts, src_pts, cv2.RANSAC, 5.0)
+        # Calculate homography (MAGSAC++ / RANSAC)
+        H, mask = cv2.findHomography(dst_pts, src_pts, HOM_METHOD, 3.0, maxIters=2000, confidence=0.999)
         
         if H is None:
-            print("   ❌ Homography calculation failed")
+            logger.warning("   ❌ Homography calculation failed")
             return None
         
         # Count inliers
         inliers = np.sum(mask)
-        print(f"   ✓ Homography calculated: {inliers}/{len(matches)} inliers")
+        logger.debug("   ✓ Homography calculated: %d/%d inliers", inliers, len(matches))
         
         return H
     
+    def _detect(self, img):
+        """
+        Detect AKAZE features on a detect_scale copy of the image (CLAHE
+        equalized if use_clahe) and pull the keypoint coordinates out once,
+        mapped back to full resolution.
+        
+        Returns:
+            tuple: (keypoints, descriptors, (N, 2) float32 point array)
+                keypoints are in downscaled coordinates, points in full-res;
+                descriptors is None (and the point array empty) if no
+                keypoints were found
+        """
+        scale = self.detect_scale
+        if scale != 1.0:
+            img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        if self.use_clahe:
+            # CLAHE objects keep scratch state -> one per call (bands run in parallel).
+            # Intensity-only remap, so keypoint coordinates are unaffected.
+            clahe = cv2.createCLAHE(clipLimit=CLAHE_CLIP_LIMIT, tileGridSize=CLAHE_TILE_GRID)
+            img = clahe.apply(img)
+        kp, desc = self.akaze.detectAndCompute(img, None)
+        if desc is None:
+            # Dark / low-texture band: nothing to match
+            return kp, None, np.empty((0, 2), np.float32)
+        kp, desc = self._keep_strongest(kp, desc)
+        pts = cv2.KeyPoint_convert(kp)
+        if scale != 1.0:
+            pts /= scale
+        return kp, desc, pts
+    
+    def set_akaze_threshold(self, threshold):
+        """
+        Set the AKAZE detector threshold (higher -> fewer, stronger keypoints).
+        
+        Args:
+            threshold: Detector response threshold (OpenCV default 0.001)
+        """
+        self.akaze.setThreshold(threshold)
+        # Cached reference features were detected with the old threshold
+        self._ref_cache = {}
+    
+    def _keep_strongest(self, kp, desc):
+        """
+        Keep the max_features keypoints with the highest detector response.
+        
+        Returns:
+            tuple: (keypoints, descriptors), unchanged if under the limit
+        """
+        k = self.max_features
+        if k is None or len(kp) <= k:
+            return kp, desc
+        
+        response = np.fromiter((p.response for p in kp), dtype=np.float32, count=len(kp))
+        idx = np.argpartition(-response, k)[:k]
+        return [kp[j] for j in idx], desc[idx]
+    
+    def _detect_reference(self, ref_img):
+        """
+        Detect AKAZE features on the reference band, reusing the previous
+        result when the same image content is passed again.
+        """
+        ref_key = (ref_img.shape, self.detect_scale, self.max_features, self.use_clahe, hashlib.blake2b(ref_img.tobytes(), digest_size=8).digest())
+        cached = self._ref_cache.get(ref_key)
+        if cached is None:
+            cached = self._detect(ref_img)
+            # Only the latest reference is worth keeping
+            self._ref_cache = {ref_key: cached}
+        return cached
+    
     def automatic_transformation_estimation(self, images, return_matches=False):
         """
         Estimate homography using AKAZE feature detection.
@@ -145,40 +273,46 @@ class CoreGeoTransform(QObject):
         Returns:
             Dictionary with homographies and optionally match info
         """
-        # Create AKAZE detector
-        akaze = cv2.AKAZE_create()
-        
-        # Reference image (Band 1)
-        ref_img = images[0]
-        kp_ref, des_ref = akaze.detectAndCompute(ref_img, None)
+        # Detect reference (Band 1, cached across calls) and targets concurrently
+        ref_future = self._pool.submit(self._detect_reference, images[0])
+        target_futures = {
+            i: self._pool.submit(self._detect, images[i - 1])
+            for i in [2, 3, 4]
+        }
+        kp_ref, des_ref, pts_ref = ref_future.result()
+        
+        # Match each band to reference concurrently
+        # (two-set knnMatch works on an internal clone, so sharing self.bf is safe).
+        # Bands without descriptors (or a featureless reference) are skipped
+        detections = {i: f.result() for i, f in target_futures.items()}
+        match_futures = {
+            i: self._pool.submit(self.bf.knnMatch, des_target, des_ref, k=2)
+            for i, (_, des_target, _) in detections.items()
+            if des_target is not None and des_ref is not None
+        }
         
         results = {}
         matches_data = {}
         
-        # Match each band to reference
         for i in [2, 3, 4]:
-            target_img = images[i - 1]
-            kp_target, des_target = akaze.detectAndCompute(target_img, None)
+            kp_target, _, pts_target = detections[i]
             
-            # Match features using BFMatcher
-            bf = cv2.BFMatcher(cv2.NORM_HAMMING, crossCheck=False)
-            matches = bf.knnMatch(des_target, des_ref, k=2)
-            
-            # Apply ratio test (Lowe's ratio test)
-            good_matches = []
-            for m_n in matches:
-                if len(m_n) == 2:
-                    m, n = m_n
-                    if m.distance < 0.75 * n.distance:
-                        good_matches.append(m)
+            # Apply ratio test (Lowe's ratio test); no descriptors -> no matches
+            if i in match_futures:
+                good_matches = self._ratio_test(match_futures[i].result(), 0.75)
+            else:
+                logger.warning("   ❌ Band %d: no AKAZE features, skipping", i)
+                good_matches = []
             
             if len(good_matches) >= 4:
-                # Extract matched points
-                src_pts = np.float32([kp_target[m.queryIdx].pt for m in good_matches])
-                dst_pts = np.float32([kp_ref[m.trainIdx].pt for m in good_matches])
+                # Extract matched points (array gather, no per-match .pt tuples)
+                qi, ti = self._match_indices(good_matches)
+                src_pts = pts_target[qi]
+                dst_pts = pts_ref[ti]
                 
-                # Compute homography
-                H, mask = cv2.findHomography(src_pts, dst_pts, cv2.RANSAC, 5.0)
+                # Compute homography (points are full-res, so H applies to
+                # the original bands - same as S @ H_small @ inv(S))
+                H, mask = cv2.findHomography(src_pts, dst_pts, HOM_METHOD, 3.0, maxIters=2000, confidence=0.999)
                 
                 results[f'H_{i}1'] = H
                 
@@ -187,8 +321,9 @@ class CoreGeoTransform(QObject):
                 
                 if return_matches:
                     matches_data[f'matches_{i}1'] = {
-                        'keypoints1': kp_ref,
-                        'keypoints2': kp_target,
+                        # Full-res keypoints for drawing on the original bands
+                        'keypoints1': cv2.KeyPoint_convert(pts_ref),
+                        'keypoints2': cv2.KeyPoint_convert(pts_target),
                         'good_matches': good_matches,
                         'num_kp1': len(kp_ref),
                         'num_kp2': len(kp_target),
@@ -209,7 +344,7 @@ class CoreGeoTransform(QObject):
         return results
 
     
-    def warp_perspective(self, image, H, output_shape=None):
+    def warp_perspective(self, image, H, output_shape=None, dst=None):
         """
         Warp image using homography matrix.
         
@@ -217,6 +352,7 @@ class CoreGeoTransform(QObject):
             image: Input image to warp
             H: 3x3 homography matrix
             output_shape: (height, width) of output, defaults to input shape
+            dst: Optional preallocated output array (output_shape, image dtype)
             
         Returns:
             numpy.ndarray: Warped image
@@ -227,9 +363,47 @@ class CoreGeoTransform(QObject):
         if output_shape is None:
             output_shape = (image.shape[0], image.shape[1])
         
-        warped = cv2.warpPerspective(image, H, (output_shape[1], output_shape[0]))
+        # H is static between calibrations -> reuse the per-pixel source
+        # coordinates instead of letting warpPerspective recompute them
+        map1, map2 = self._get_remap(H, output_shape)
+        warped = cv2.remap(image, map1, map2, cv2.INTER_LINEAR, dst=dst, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
         return warped
     
+    def submit_warp(self, image, H, output_shape=None, dst=None):
+        """
+        Run warp_perspective on the worker pool (OpenCV releases the GIL).
+        
+        Returns:
+            concurrent.futures.Future: resolves to the warped image
+        """
+        return self._pool.submit(self.warp_perspective, image, H, output_shape, dst)
+    
+    def _get_remap(self, H, output_shape):
+        """
+        Build (or fetch) the cv2.remap tables equivalent to warpPerspective(H).
+        
+        Args:
+            H: 3x3 homography matrix
+            output_shape: (height, width) of output
+            
+        Returns:
+            tuple: (map1, map2) fixed-point CV_16SC2 maps
+        """
+        H = np.asarray(H, dtype=np.float64)
+        key = (H.tobytes(), tuple(output_shape))
+        maps = self._map_cache.get(key)
+        if maps is None:
+            h, w = output_shape
+            ys, xs = np.mgrid[0:h, 0:w].astype(np.float32)
+            grid = np.dstack([xs, ys]).reshape(-1, 1, 2)
+            src = cv2.perspectiveTransform(grid, np.linalg.inv(H)).reshape(h, w, 2)
+            maps = cv2.convertMaps(src[..., 0], src[..., 1], cv2.CV_16SC2)
+            # A handful of bands/sizes at most; drop stale calibrations
+            if len(self._map_cache) >= 8:
+                self._map_cache.clear()
+            self._map_cache[key] = maps
+        return maps
+    
     def align_all_bands(self, images):
         """
         Align all 4 bands to Band 1 using stored homography matrices.
@@ -239,6 +413,8 @@ class CoreGeoTransform(QObject):
             
         Returns:
             list: Aligned images [B1, B2_aligned, B3_aligned, B4_aligned]
+                Warped bands are per-instance buffers overwritten by the next
+                call - copy them if they must outlive the current frame.
         """
         if len(images) != 4:
             self.error_occurred.emit("Expected 4 band images")
@@ -249,13 +425,19 @@ class CoreGeoTransform(QObject):
         for i in [2, 3, 4]:
             H = self.homography_matrices.get(f'H_{i}1')
             if H is not None:
-                aligned = self.warp_perspective(images[i-1], H)
+                src = images[i-1]
+                # Reuse this band's output buffer (reallocate on shape/dtype change)
+                buf = self._aligned_bufs.get(i)
+                if buf is None or buf.shape != src.shape or buf.dtype != src.dtype:
+                    buf = np.empty_like(src)
+                    self._aligned_bufs[i] = buf
+                aligned = self.warp_perspective(src, H, dst=buf)
                 aligned_images.append(aligned)
-                print(f"✓ Band {i} aligned")
+                logger.debug("✓ Band %d aligned", i)
             else:
                 # No transformation available, use original
                 aligned_images.append(images[i-1])
-                print(f"⚠️ Band {i} not aligned (no transformation)")
+                logger.debug("⚠️ Band %d not aligned (no transformation)", i)
         
         return aligned_images
     
@@ -317,14 +499,76 @@ class CoreGeoTransform(QObject):
                     H = np.array(values).reshape(3, 3)
                     results[key] = H
                     self.homography_matrices[key] = H
-                    print(f"✓ Loaded {key}")
+                    logger.debug("✓ Loaded %s", key)
             else:
                 results[key] = None
                 self.homography_matrices[key] = None
         
-        print(f"✅ Configuration loaded: {filepath}")
+        logger.info("✅ Configuration loaded: %s", filepath)
         return results
     
+    def save_config_npz(self, filepath):
+        """
+        Save homography matrices to a compressed NumPy .npz file
+        (bit-exact float64 round trip, unlike the INI text format).
+        
+        Args:
+            filepath: Path to save .npz file
+        """
+        arrays = {}
+        for key in ['H_11', 'H_21', 'H_31', 'H_41']:
+            H = self.homography_matrices.get(key)
+            # Missing matrices are stored as all-NaN
+            arrays[key] = np.full((3, 3), np.nan) if H is None else np.asarray(H, dtype=np.float64)
+        
+        # File object -> numpy does not append a second .npz suffix
+        with open(filepath, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        
+        # ✅ STATUS MESSAGE
+        self.status_message.emit(f"Configuration saved: {os.path.basename(filepath)}", 0)
+    
+    def load_config_npz(self, filepath):
+        """
+        Load homography matrices from a .npz file written by save_config_npz.
+        
+        Args:
+            filepath: Path to .npz file
+            
+        Returns:
+            dict: Loaded homography matrices
+        """
+        if not os.path.exists(filepath):
+            self.error_occurred.emit(f"File not found: {filepath}")
+            return None
+        
+        results = {}
+        
+        with np.load(filepath) as data:
+            for key in ['H_11', 'H_21', 'H_31', 'H_41']:
+                H = data[key] if key in data.files else None
+                if H is None or np.isnan(H).all():
+                    H = None
+                results[key] = H
+                self.homography_matrices[key] = H
+        
+        logger.info("✅ Configuration loaded: %s", filepath)
+        return results
+    
+    def load_config(self, filepath):
+        """
+        Load homography matrices from an .npz or legacy .ini file.
+        
+        Args:
+            filepath: Path to .npz or .ini file
+            
+        Returns:
+            dict: Loaded homography matrices
+        """
+        if filepath.lower().endswith('.npz'):
+            return self.load_config_npz(filepath)
+        return self.load_config_ini(filepath)
+    
     def add_manual_point_pair(self, points_dict):
         """
         Add manual correspondence points for manual alignment.
@@ -348,11 +592,12 @@ class CoreGeoTransform(QObject):
             numpy.ndarray: 3x3 homography matrix
         """
         if len(src_points) < 4 or len(dst_points) < 4:
-            print("❌ Need at least 4 point pairs for homography")
+            logger.warning("❌ Need at least 4 point pairs for homography")
             return None
         
-        src_pts = np.float32(src_points).reshape(-1, 1, 2)
-        dst_pts = np.float32(dst_points).reshape(-1, 1, 2)
+        # findHomography takes (N, 2) point arrays as-is
+        src_pts = np.float32(src_points)
+        dst_pts = np.float32(dst_points)
         
         H, _ = cv2.findHomography(src_pts, dst_pts, 0)
         return H
@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import QFileDialog, QMessageBox
 from PySide6.QtGui import QImage, QPixmap
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QRect
 import cv2
 import numpy as np
 
@@ -49,21 +49,17 @@ def load_reference_image(entry, ref_labels_local, tiles_store=None, path=None):
         )
         return
     
+    # One Grayscale8 QImage over the whole (contiguous) frame - no RGB expansion
+    full_qimg = QImage(img.data, FULL_W, FRAME_H, img.strides[0], QImage.Format_Grayscale8)
+    
     # Split into 4 tiles and display
     for i in range(4):
-        tile = img[:, i * FRAME_W : (i + 1) * FRAME_W]
-        
-        # Store raw tile if requested
+        # Store raw tile if requested (view into img, which it keeps alive)
         if tiles_store is not None:
-            tiles_store[i] = tile.copy()
-        
-        # Convert to RGB for display
-        tile_rgb = cv2.cvtColor(tile, cv2.COLOR_GRAY2RGB)
+            tiles_store[i] = img[:, i * FRAME_W : (i + 1) * FRAME_W]
         
-        # Convert to QPixmap
-        h, w = tile_rgb.shape[:2]
-        bytes_per_line = 3 * w
-        qimg = QImage(tile_rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
+        # Sub-rect of the frame -> QPixmap
+        qimg = full_qimg.copy(QRect(i * FRAME_W, 0, FRAME_W, FRAME_H))
         pixmap = QPixmap.fromImage(qimg).scaled(
             ref_labels_local[i].size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
         )
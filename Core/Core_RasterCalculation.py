@@ -2,6 +2,17 @@ from PySide6.QtCore import QObject, Signal
 import numpy as np
 import re
 
+# Optional: NumExpr fuses the whole expression into one multi-threaded kernel
+# (no full-size temporaries per sub-expression). Falls back to eval.
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+# Expression validation patterns (compiled once)
+_ALLOWED_RE = re.compile(r"^[\w\s\+\-\*\/\%\(\)\.]+$")
+_BAND_RE = re.compile(r"\bR[1-4]\b")
+
 class CoreRasterCalculator(QObject):
     """Handles raster calculation with multiple stored rasters."""
     
@@ -25,13 +36,11 @@ class CoreRasterCalculator(QObject):
             return False, "Expression is empty"
         
         # ✅ FIX: Allow parentheses and operators (removed extra backslashes)
-        allowed = re.compile(r"^[\w\s\+\-\*\/\%\(\)\.]+$")
-        
-        if not allowed.match(expression):
+        if not _ALLOWED_RE.match(expression):
             return False, "Expression contains invalid characters"
         
         # Check for band references
-        if not any(band in expression for band in ["R1", "R2", "R3", "R4"]):
+        if not _BAND_RE.search(expression):
             return False, "Expression must reference at least one band (R1-R4)"
         
         return True, ""
@@ -42,10 +51,12 @@ class CoreRasterCalculator(QObject):
         
         Args:
             expression: String expression like "(R1 - R2) / (R1 + R2)"
-            reflectance_tiles: List of 4 numpy arrays
+            reflectance_tiles: List of 4 numpy arrays (may be views into
+                reused reflectance buffers)
         
         Returns:
-            numpy array result or None if error
+            numpy array result or None if error. Never aliases the input
+            tiles, so it is safe to store.
         """
         if reflectance_tiles is None or len(reflectance_tiles) != 4:
             return None
@@ -56,9 +67,17 @@ class CoreRasterCalculator(QObject):
             "R2": reflectance_tiles[1],
             "R3": reflectance_tiles[2],
             "R4": reflectance_tiles[3],
-            "np": np,
         }
         
+        if ne is not None:
+            try:
+                # NumExpr keeps its own cache of compiled expressions
+                return self._detach(ne.evaluate(expression, local_dict=namespace), reflectance_tiles)
+            except Exception:
+                # Not NumExpr syntax (e.g. np.* calls) -> plain eval below
+                pass
+        
+        namespace["np"] = np
         try:
             # ✅ SIMPLEST FIX: Just use eval with namespace
             result = eval(expression, namespace)
@@ -67,13 +86,24 @@ class CoreRasterCalculator(QObject):
             if not isinstance(result, np.ndarray):
                 result = np.array(result)
             
-            return result
+            return self._detach(result, reflectance_tiles)
             
         except Exception as e:
             print(f"❌ Raster eval error: {e}")
             print(f"   Expression: {expression}")
             return None
     
+    @staticmethod
+    def _detach(result, reflectance_tiles):
+        """
+        Copy result if it aliases an input tile (e.g. expression "R1"): the
+        tiles are views into buffers the reflectance calculator overwrites
+        two frames later, and stored rasters must not change underneath.
+        """
+        if any(np.may_share_memory(result, t) for t in reflectance_tiles):
+            return result.copy()
+        return result
+    
     def add_calculated_raster(self, expression, result):
         """Store a newly calculated raster (NO PRINT - handled by Lib)."""
         self.raster_counter += 1
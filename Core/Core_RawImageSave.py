@@ -1,6 +1,8 @@
 from PySide6.QtCore import QObject, Slot, Signal
 from PySide6.QtWidgets import QFileDialog, QMessageBox
 import os
+import queue
+import threading
 from datetime import datetime
 import cv2
 import numpy as np
@@ -8,12 +10,45 @@ import numpy as np
 class CoreRawImageSave(QObject):
     # ✅ NEW: Signal for status bar updates
     status_message = Signal(str, int)  # (message, timeout_ms)
+    # Emitted by the writer thread; queued to the GUI thread for the dialog
+    write_failed = Signal(str)
+    
+    # zlib level 1: ~3x faster PNG encode than the default 3, still lossless
+    PNG_PARAMS = [cv2.IMWRITE_PNG_COMPRESSION, 1]
     
     def __init__(self):
         super().__init__()
         self.save_dir = ""
         self.exp_ms100 = [0, 0, 0, 0]
         self.save_active = False
+        
+        # PNG encoding runs on a background writer thread (started on first save)
+        self._save_q = queue.Queue(maxsize=64)
+        self._writer = None
+        self.write_failed.connect(self._on_write_failed)
+    
+    def _writer_loop(self):
+        """Encode and write queued (fname, frame) pairs until the app exits."""
+        while True:
+            fname, frame = self._save_q.get()
+            try:
+                success = cv2.imwrite(fname, frame, self.PNG_PARAMS)
+            except Exception as e:
+                self.write_failed.emit(f"Error saving image: {str(e)}")
+                continue
+            
+            if success:
+                # ✅ STATUS BAR (brief message)
+                self.status_message.emit(f"Saved: {os.path.basename(fname)}", 0)
+            else:
+                self.write_failed.emit(f"Failed to write image: {fname}")
+    
+    @Slot(str)
+    def _on_write_failed(self, message):
+        # ✅ QMessageBox for error (but don't spam)
+        if not hasattr(self, '_write_error_shown'):
+            QMessageBox.critical(None, "Write Failed", message)
+            self._write_error_shown = True
     
     @Slot()
     def select_timestamp_folder(self, entry):
@@ -67,20 +102,16 @@ class CoreRawImageSave(QObject):
                 f"{stamp}_{self.exp_ms100[0]:04d}_{self.exp_ms100[1]:04d}_{self.exp_ms100[2]:04d}_{self.exp_ms100[3]:04d}.png"
             )
             
-            success = cv2.imwrite(fname, last_fullframe)
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+                self._writer.start()
             
-            if success:
-                # ✅ STATUS BAR (brief message)
-                self.status_message.emit(f"Saved: {os.path.basename(fname)}", 0)
-            else:
-                # ✅ QMessageBox for error (but don't spam)
-                if not hasattr(self, '_write_error_shown'):
-                    QMessageBox.critical(
-                        None,
-                        "Write Failed",
-                        f"Failed to write image: {fname}"
-                    )
-                    self._write_error_shown = True
+            # Hand off to the writer (copy: callers may reuse the buffer)
+            try:
+                self._save_q.put_nowait((fname, last_fullframe.copy()))
+            except queue.Full:
+                # ✅ STATUS BAR - writer is behind, drop this frame
+                self.status_message.emit("Save queue full - frame dropped", 2000)
         except Exception as e:
             # ✅ QMessageBox for error
             QMessageBox.critical(
@@ -1,8 +1,7 @@
 from PySide6.QtCore import QObject
-from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtGui import QImage, QPixmap, QPainter, QPen, QColor
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import QMessageBox
-import cv2
 import numpy as np
 import os
 
@@ -37,12 +36,16 @@ class CoreRefRadianceEstimator(QObject):
                 print(f"Reference folder not found: {ref_dir}")
                 return
             
-            candidates = [f for f in os.listdir(ref_dir) if f.lower().endswith(".png")]
-            if not candidates:
+            # First PNG found - stop scanning as soon as one matches
+            with os.scandir(ref_dir) as it:
+                ref_path = next(
+                    (e.path for e in it if e.name.lower().endswith(".png") and e.is_file()),
+                    None,
+                )
+            if ref_path is None:
                 print("No PNG files found in Reference folder")
                 return
             
-            ref_path = os.path.join(ref_dir, candidates[0])
             # Normalize the full path as well
             ref_path = os.path.normpath(ref_path)
             
@@ -57,6 +60,14 @@ class CoreRefRadianceEstimator(QObject):
         except Exception as e:
             print(f"Auto reference load error: {e}")
     
+    @staticmethod
+    def _entry_float(entry):
+        """Parse a QLineEdit as float, 0.0 if empty or invalid."""
+        try:
+            return float(entry.text())
+        except Exception:
+            return 0.0
+    
     def estimate_reference_radiance(self, ref_entry, ref_labels, ref_cam_entries, bg_cam_entries):
         """
         Estimate reference radiance using formula:
@@ -113,58 +124,53 @@ class CoreRefRadianceEstimator(QObject):
             )
             return
         
-        # Process each camera/band
-        for i in range(4):
+        loaded = [i for i in range(4) if self.ref_tiles[i] is not None]
+        if not loaded:
+            return
+        
+        # All bands come from one frame -> same shape, same ROI
+        h, w = self.ref_tiles[loaded[0]].shape
+        win_size = 100
+        cx, cy = w // 2, h // 2
+        
+        # Calculate ROI bounds (center 100x100 pixels)
+        x1 = max(0, cx - win_size // 2)
+        y1 = max(0, cy - win_size // 2)
+        x2 = min(w, cx + win_size // 2)
+        y2 = min(h, cy + win_size // 2)
+        
+        # ROI means of all loaded bands in one reduction
+        rois = np.stack([self.ref_tiles[i][y1:y2, x1:x2] for i in loaded])
+        means = rois.reshape(len(loaded), -1).mean(axis=1)
+        
+        # Background noise per CAM from Tab 2 (fallback 0)
+        bgs = np.array([self._entry_float(bg_cam_entries[i]) for i in loaded])
+        
+        # Exposure in ms (divide by 100 from filename), 0 -> 1 ms
+        exp_ms = np.array([expo100_vals[i] for i in loaded], dtype=np.float64) / 100.0
+        exp_ms[exp_ms == 0] = 1.0
+        
+        # Reference radiance formula: (mean - background) / exposure
+        ref_rads = (means - bgs) / exp_ms
+        
+        # Display ROI and radiance per band
+        for i, ref_rad in zip(loaded, ref_rads):
             tile = self.ref_tiles[i]
-            if tile is None:
-                continue
-            
-            h, w = tile.shape
-            win_size = 100
-            cx, cy = w // 2, h // 2
-            
-            # Calculate ROI bounds (center 100x100 pixels)
-            x1 = max(0, cx - win_size // 2)
-            y1 = max(0, cy - win_size // 2)
-            x2 = min(w, cx + win_size // 2)
-            y2 = min(h, cy + win_size // 2)
-            
-            roi = tile[y1:y2, x1:x2]
-            
-            if roi.size == 0:
-                mean_val = 0.0
-            else:
-                mean_val = float(np.mean(roi))
-            
-            # print(f"🔍 BAND {i+1} - ROI mean pixel value: {mean_val:.2f}")
-            
-            # Background noise for this CAM from Tab 2 (fallback 0)
-            try:
-                bg_val = float(bg_cam_entries[i].text())
-            except Exception:
-                bg_val = 0.0
-            
-            # print(f"   Background value: {bg_val:.2f}")
-            
-            # Exposure in ms (divide by 100 from filename)
-            exp_ms = expo100_vals[i] / 100.0 if expo100_vals[i] != 0 else 1.0
-            
-            # print(f"   Exposure time: {exp_ms:.2f} ms")
-            
-            # Reference radiance formula: (mean - background) / exposure
-            ref_rad = (mean_val - bg_val) / exp_ms
             
-            # print(f"   ➡️ Reference radiance: ({mean_val:.2f} - {bg_val:.2f}) / {exp_ms:.2f} = {ref_rad:.2f}\n")
+            # Grayscale8 QImage straight from the tile (no RGB expansion);
+            # tiles may be column views of the frame -> make them contiguous
+            tile_c = np.ascontiguousarray(tile)
+            qimg = QImage(tile_c.data, w, h, tile_c.strides[0], QImage.Format_Grayscale8)
+            pixmap = QPixmap.fromImage(qimg)
             
-            # Draw blue rectangle on tile to show ROI
-            tile_rgb = cv2.cvtColor(tile, cv2.COLOR_GRAY2RGB)
-            cv2.rectangle(tile_rgb, (x1, y1), (x2 - 1, y2 - 1), (255, 0, 0), 2)
+            # Draw blue rectangle on tile to show ROI (on the pixmap, in colour)
+            painter = QPainter(pixmap)
+            painter.setPen(QPen(QColor(255, 0, 0), 2))
+            painter.drawRect(x1, y1, x2 - 1 - x1, y2 - 1 - y1)
+            painter.end()
             
-            # Convert to QPixmap and display
-            h_rgb, w_rgb = tile_rgb.shape[:2]
-            bytes_per_line = 3 * w_rgb
-            qimg = QImage(tile_rgb.data, w_rgb, h_rgb, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qimg).scaled(
+            # Scale and display
+            pixmap = pixmap.scaled(
                 ref_labels[i].size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
             )
             ref_labels[i].setPixmap(pixmap)
@@ -1,6 +1,7 @@
 from PySide6.QtCore import QObject
 from PySide6.QtWidgets import QMessageBox
 import numpy as np
+from Core.Core_ReflectanceKernels import reflectance_into
 
 # Frame dimensions
 FRAME_H = 480
@@ -13,43 +14,51 @@ class CoreReflectanceCalculator(QObject):
     def __init__(self):
         super().__init__()
         self.warning_invalid_params_shown = False
+        
+        # Two preallocated (4, H, W) output sets, alternated per call: the
+        # tiles returned by one call stay valid until the call after next
+        self._refl_buffers = [np.empty((4, FRAME_H, FRAME_W), dtype=np.float32) for _ in range(2)]
+        self._refl_index = 0
     
-    def calculate_reflectance(self, last_fullframe, bg_tiles, expo_sliders, ref_cam_entries, EXPO_MS):
+    def calculate_reflectance(self, last_fullframe, bg_stack, expo_sliders, ref_cam_entries, EXPO_MS):
         """
         Calculate reflectance for each CAM using formula:
         reflectance_i = (CAM_i - BG_i) / exposure_i / ref_radiance_i
+        evaluated as (CAM_i - BG_i) * inv_i with the per-band reciprocal
+        inv_i = 1 / (exposure_i * ref_radiance_i) computed once in float64
         
         Args:
             last_fullframe: Full camera frame (480 x 2560)
-            bg_tiles: List of 4 background noise tiles
+            bg_stack: float32 background noise stack (4, H, W) from
+                CoreDarkNoiseEstimator.background_stack_f32(), or None
             expo_sliders: List of 4 QSlider widgets for exposure
             ref_cam_entries: List of 4 QLineEdit widgets with reference radiance values
             EXPO_MS: Exposure time lookup table
             
         Returns:
-            List of 4 reflectance tiles (numpy float32 arrays) or None if error
+            List of 4 reflectance tiles (numpy float32 arrays) or None if error.
+            The tiles are views into reused buffers - copy them to keep a
+            result for longer than one further call.
         """
         if last_fullframe is None:
             return None
         
-        reflectance_tiles = []
+        # Check if background tiles exist
+        if bg_stack is None:
+            if not self.warning_invalid_params_shown:
+                QMessageBox.warning(
+                    None,
+                    "Missing Background",
+                    "Please load and estimate background noise first (Tab 2)."
+                )
+                self.warning_invalid_params_shown = True
+            return None
+        
+        exp_ms_vals = np.empty(4, dtype=np.float64)
+        ref_rad_vals = np.empty(4, dtype=np.float64)
         
+        # Validate per-band parameters (scalar) before touching pixel data
         for i in range(4):
-            # Check if background tile exists
-            if bg_tiles[i] is None:
-                if not self.warning_invalid_params_shown:
-                    QMessageBox.warning(
-                        None,
-                        "Missing Background",
-                        "Please load and estimate background noise first (Tab 2)."
-                    )
-                    self.warning_invalid_params_shown = True
-                return None
-            
-            # Extract camera tile for this band
-            cam_tile = last_fullframe[:, i * FRAME_W : (i + 1) * FRAME_W].astype(np.float32)
-            bg_tile = bg_tiles[i].astype(np.float32)
-            
             # Get exposure time from slider
             if i < len(expo_sliders):
                 level = int(expo_sliders[i].value())
@@ -76,12 +85,18 @@ class CoreReflectanceCalculator(QObject):
                     self.warning_invalid_params_shown = True
                 return None
             
-            # Calculate reflectance
-            numerator = cam_tile - bg_tile
-            refl = numerator / exp_ms / ref_rad
-            
-            # print(f"🔍 BAND {i+1} reflectance: exp={exp_ms:.2f}ms, ref_rad={ref_rad:.2f}, range=[{np.min(refl):.4f}, {np.max(refl):.4f}]")
-            
-            reflectance_tiles.append(refl)
+            exp_ms_vals[i] = exp_ms
+            ref_rad_vals[i] = ref_rad
+        
+        # One reciprocal multiply per pixel instead of two divisions
+        inv = (1.0 / (exp_ms_vals * ref_rad_vals)).astype(np.float32)
+        
+        # Calculate reflectance - all 4 bands in one fused pass over the frame
+        self._refl_index ^= 1
+        refl = self._refl_buffers[self._refl_index]
+        reflectance_into(last_fullframe, bg_stack, inv, refl)
+        
+        # print(f"🔍 reflectance: exp={exp_ms_vals}, ref_rad={ref_rad_vals}, range=[{refl.min():.4f}, {refl.max():.4f}]")
         
-        return reflectance_tiles
+        # Per-band (480, 640) views of the stacked result
+        return list(refl)
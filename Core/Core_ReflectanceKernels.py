@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+
+# Optional: Numba fuses cast + subtract + scale into one parallel pass over
+# the uint8 frame (no float32 temporaries). Falls back to cv2.subtract (cast
+# and subtract in one SIMD pass) plus an in-place NumPy scale.
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _reflectance_numba(frame, bg, inv, out):
+        n_bands, h, w = out.shape
+        # One parallel task per (band, row)
+        for k in prange(n_bands * h):
+            b = k // h
+            r = k % h
+            scale = inv[b]
+            c0 = b * w
+            for c in range(w):
+                out[b, r, c] = (np.float32(frame[r, c0 + c]) - bg[b, r, c]) * scale
+
+
+def reflectance_into(frame, bg, inv, out):
+    """
+    Compute (CAM_i - BG_i) * inv_i for all bands into a preallocated array.
+
+    Args:
+        frame: Full camera frame (H x n_bands*W), bands side by side
+        bg: float32 background stack (n_bands, H, W)
+        inv: float32 per-band scale 1 / (exposure * ref_radiance), shape (n_bands,)
+        out: float32 output array (n_bands, H, W)
+
+    Returns:
+        out
+    """
+    n_bands, h, w = out.shape
+
+    if HAVE_NUMBA and frame.dtype == np.uint8:
+        _reflectance_numba(frame, bg, inv, out)
+    else:
+        # (H, n*W) -> (n, H, W) view; cv2 reads the strided band rows directly
+        bands = frame.reshape(h, n_bands, w).transpose(1, 0, 2)
+        for b in range(n_bands):
+            cv2.subtract(bands[b], bg[b], dst=out[b], dtype=cv2.CV_32F)
+        out *= inv.reshape(n_bands, 1, 1)
+
+    return out
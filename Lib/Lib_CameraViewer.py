@@ -1,6 +1,6 @@
 from PySide6.QtWidgets import QMessageBox, QWidget, QFileDialog
-from PySide6.QtGui import QImage, QPixmap
-from PySide6.QtCore import Qt, QTimer, Slot, Signal
+from PySide6.QtGui import QPixmap
+from PySide6.QtCore import Qt, QTimer, Slot, Signal, QCoreApplication, QEvent
 from UI.ui_CameraView import Ui_Form
 from Core.Core_CameraConnect import CoreCameraConnect
 from Core.Core_CameraView import (
@@ -8,11 +8,12 @@ from Core.Core_CameraView import (
     ZMQ_ADDR,
     CameraGainExposure,
     ZMQReceiverThread,
+    FrameConverterThread,
     FRAME_W,
-    EXPO_MS,
+    EXPO_MS100,
 )
 from Core.Core_RawImageSave import CoreRawImageSave
-import cv2
+import Core.Core_CameraView as ccv
 import os
 from datetime import datetime
 import numpy as np
@@ -27,10 +28,9 @@ class CameraViewerTab(QWidget):
         self.ui.setupUi(self)
         
         # === CAMERA CONNECT ===
-        lan_ip = CoreCameraConnect().get_lan_ip()
-        self.ui.router_ip_add_in_2.setText(lan_ip)
-        
         self.camera_connector = CoreCameraConnect()
+        self.ui.router_ip_add_in_2.setText(self.camera_connector.get_lan_ip())
+        
         self.ui.detect_2.clicked.connect(self.camera_connector.detect_camera_ip)
         self.ui.connect_2.clicked.connect(self.on_connect_clicked)
         
@@ -98,6 +98,11 @@ class CameraViewerTab(QWidget):
         self.ui.img_overlay_act_2.stateChanged.connect(self.toggle_image_alignment)
         self.alignment_enabled = False
         self.geo_transform = None
+        # H_21, H_31, H_41 (None if missing), looked up once per loaded transform
+        self._H_list = [None, None, None]
+        self._H_warned = [False, False, False]
+        # Frame -> displayed frame; swapped to apply_alignment while alignment is on
+        self._get_display_frame = lambda f: f
         
         # === IMAGE SAVE ===
         self.raw_save = CoreRawImageSave()
@@ -111,6 +116,7 @@ class CameraViewerTab(QWidget):
         # === ZMQ + SAVE TIMERS ===
         self.zmq_thread = None
         self.update_timer = QTimer()
+        self.update_timer.setTimerType(Qt.PreciseTimer)  # steady ~30 Hz ticks
         self.update_timer.timeout.connect(self.update_frames)
         
         self.save_timer = QTimer()
@@ -118,6 +124,30 @@ class CameraViewerTab(QWidget):
         self.save_timer.start(1000)
         
         self.last_aligned_frame = None
+        # Latest received frame for update_frames (set on the GUI thread)
+        self._latest_frame = None
+        # Bumped per received frame; update_frames skips ticks with nothing new
+        self._frame_gen = 0
+        self._last_drawn_gen = -1
+        
+        # Aligned full frames: apply_alignment writes into a free pool buffer
+        # (never one the converter holds, nor last_aligned_frame); buffers
+        # return to the free list when the converter drops or releases them.
+        # In steady state the pool holds 3 buffers
+        self._aligned_bufs = []
+        self._aligned_free = []
+        
+        # Per-band display conversion runs on a worker thread; the GUI thread
+        # only turns the finished QImages into scaled pixmaps
+        self.frame_converter = FrameConverterThread()
+        self.frame_converter.images_ready.connect(self.on_images_ready)
+        self.frame_converter.start()
+        QCoreApplication.instance().aboutToQuit.connect(self.frame_converter.stop)
+        
+        # Label sizes cached on resize (not queried per frame)
+        self._display_sizes = [(lbl.width(), lbl.height()) for lbl in self.cam_images]
+        for lbl in self.cam_images:
+            lbl.installEventFilter(self)
         
     def on_connect_clicked(self):
         ip = self.ui.cam_ip_add_in_2.text().strip()
@@ -184,89 +214,133 @@ class CameraViewerTab(QWidget):
     
     @Slot(object)
     def on_frame_received(self, full_frame):
-        import Core.Core_CameraView as ccv
+        self._latest_frame = full_frame
+        self._frame_gen += 1
+        # Module global stays the shared "current frame" for the other tabs
         ccv.last_fullframe = full_frame
     
     @Slot()
     def update_frames(self):
-        from Core.Core_CameraView import last_fullframe
+        last_fullframe = self._latest_frame
         
-        if last_fullframe is None:
+        # No new frame since the last tick -> nothing to redraw
+        if last_fullframe is None or self._frame_gen == self._last_drawn_gen:
             return
+        self._last_drawn_gen = self._frame_gen
         
         # Update current expo for filename every frame
         self.update_expo_for_save()
         
-        # Apply alignment if enabled
-        aligned_frame = last_fullframe
-        if self.alignment_enabled and self.geo_transform is not None:
-            aligned_frame = self.apply_alignment(last_fullframe)
+        # Apply alignment if enabled (identity otherwise)
+        aligned_frame = self._get_display_frame(last_fullframe)
         
+        # Pool buffer just handed to the converter; it is not rewritten while
+        # it is last_aligned_frame
         self.last_aligned_frame = aligned_frame if self.alignment_enabled else None
         
-        for i in range(4):
-            tile = aligned_frame[:, i * FRAME_W : (i + 1) * FRAME_W]
-            tile_rgb = cv2.cvtColor(tile, cv2.COLOR_GRAY2RGB)
-            
-            # Highlight overexposure in red
-            mask = tile >= 255
-            tile_rgb[mask] = [255, 0, 0]
-            
-            h, w = tile_rgb.shape[:2]
-            bytes_per_line = 3 * w
-            qimg = QImage(tile_rgb.data, w, h, bytes_per_line, QImage.Format_RGB888)
-            pixmap = QPixmap.fromImage(qimg).scaled(
-                self.cam_images[i].size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
-            )
-            self.cam_images[i].setPixmap(pixmap)
+        self._recycle_aligned(self.frame_converter.submit(aligned_frame, self._display_sizes))
+    
+    @Slot(list)
+    def on_images_ready(self, images):
+        """Display the 4 band QImages (already fitted to the labels by the converter)."""
+        try:
+            for i, qimg in enumerate(images):
+                self.cam_images[i].setPixmap(QPixmap.fromImage(qimg))
+        finally:
+            # Pixmaps hold their own copy -> converter may reuse its buffers,
+            # and the frame it converted goes back to the aligned pool
+            self._recycle_aligned(self.frame_converter.release())
+    
+    def eventFilter(self, obj, event):
+        # Keep the cached display sizes in step with the camera labels
+        if event.type() == QEvent.Resize and obj in self.cam_images:
+            sizes = list(self._display_sizes)
+            sizes[self.cam_images.index(obj)] = (event.size().width(), event.size().height())
+            self._display_sizes = sizes
+        return super().eventFilter(obj, event)
+    
+    def _acquire_aligned(self, full_frame):
+        """Free pool buffer matching full_frame (allocated only if none is free)."""
+        if self._aligned_bufs and (self._aligned_bufs[0].shape != full_frame.shape
+                                   or self._aligned_bufs[0].dtype != full_frame.dtype):
+            # Frame size changed -> drop the pool (stale buffers are ignored on return)
+            self._aligned_bufs = []
+            self._aligned_free = []
+        
+        for k, buf in enumerate(self._aligned_free):
+            if buf is not self.last_aligned_frame:
+                return self._aligned_free.pop(k)
+        
+        buf = np.empty_like(full_frame)
+        self._aligned_bufs.append(buf)
+        return buf
+    
+    def _recycle_aligned(self, frame):
+        """Return a frame the converter no longer holds to the pool (if it is ours)."""
+        if frame is not None and any(frame is buf for buf in self._aligned_bufs):
+            self._aligned_free.append(frame)
     
     def apply_alignment(self, full_frame):
-        """Apply geometric transformation to align all bands to Band 1."""
-        bands = [
-            full_frame[:, 0:640],
-            full_frame[:, 640:1280],
-            full_frame[:, 1280:1920],
-            full_frame[:, 1920:2560],
-        ]
-        
-        aligned_bands = [bands[0]]
-        
-        for i in [2, 3, 4]:
-            H_key = f"H_{i}1"
-            H = self.geo_transform.homography_matrices.get(H_key)
-            
+        """
+        Apply geometric transformation to align all bands to Band 1.
+        
+        Bands are warped straight into their column span of a pooled frame
+        buffer (no per-frame hstack or copy). The returned buffer belongs to
+        the caller until it is handed to the frame converter, which returns
+        it via submit()/release().
+        """
+        # (480, 2560) -> (4, 480, 640) band views in one reshape; only a
+        # non-contiguous frame would be copied here (once, not per band)
+        full_frame = np.ascontiguousarray(full_frame)
+        bands = full_frame.reshape(full_frame.shape[0], 4, -1).transpose(1, 0, 2)
+        
+        aligned = self._acquire_aligned(full_frame)
+        out_bands = aligned.reshape(full_frame.shape[0], 4, -1).transpose(1, 0, 2)
+        
+        np.copyto(out_bands[0], bands[0])
+        
+        warps = []
+        for i, H in enumerate(self._H_list, start=2):
             if H is not None:
-                aligned = cv2.warpPerspective(
+                # Cached remap tables (bilinear, zero border), written in place;
+                # the three bands are warped concurrently on the pool
+                warps.append(self.geo_transform.submit_warp(
                     bands[i - 1],
                     H,
-                    (640, 480),
-                    flags=cv2.INTER_LINEAR,
-                    borderMode=cv2.BORDER_CONSTANT,
-                    borderValue=0,
-                )
-                aligned_bands.append(aligned)
+                    (480, 640),
+                    dst=out_bands[i - 1],
+                ))
             else:
                 # ✅ QMessageBox for error (only first time)
-                if not hasattr(self, f'_warned_{H_key}'):
+                if not self._H_warned[i - 2]:
                     QMessageBox.warning(
                         self,
                         "Missing Transformation",
-                        f"Transformation matrix {H_key} not found. Using original band."
+                        f"Transformation matrix H_{i}1 not found. Using original band."
                     )
-                    setattr(self, f'_warned_{H_key}', True)
-                aligned_bands.append(bands[i - 1])
-        
-        aligned_frame = np.hstack(aligned_bands)
-        return aligned_frame
+                    self._H_warned[i - 2] = True
+                np.copyto(out_bands[i - 1], bands[i - 1])
+        
+        # Wait for all warps, then re-raise the first worker exception (the
+        # buffer goes back to the pool only once no warp is writing to it)
+        error = None
+        for warp in warps:
+            try:
+                warp.result()
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            self._recycle_aligned(aligned)
+            raise error
+        
+        return aligned
     
     def update_expo_for_save(self):
         """Update saver with current slider exposures (for filename)."""
-        exp_ms100 = []
-        for slider in self.expo_sliders:
-            level = max(1, min(12, slider.value()))
-            ms = EXPO_MS[level - 1]
-            exp_ms100.append(int(round(ms * 100)))
-        self.raw_save.exp_ms100 = exp_ms100
+        # Table lookup per slider (level clamped to 1..12)
+        self.raw_save.exp_ms100 = [
+            EXPO_MS100[max(1, min(12, slider.value())) - 1] for slider in self.expo_sliders
+        ]
     
     @Slot()
     def save_if_active(self):
@@ -307,12 +381,16 @@ class CameraViewerTab(QWidget):
         
         if result == QDialog.Accepted:
             self.geo_transform = dlg.geo_transform
+            self._H_list = [
+                self.geo_transform.homography_matrices.get(k) for k in ("H_21", "H_31", "H_41")
+            ]
             self.status_message.emit("Transformation matrices loaded", 0)
         
     @Slot(int)
     def toggle_image_alignment(self, state):
         """Toggle real-time image alignment on/off."""
         self.alignment_enabled = bool(state)
+        self._get_display_frame = lambda f: f
         
         if self.alignment_enabled:
             if self.geo_transform is None:
@@ -325,6 +403,7 @@ class CameraViewerTab(QWidget):
                 self.ui.img_overlay_act_2.setChecked(False)
                 self.alignment_enabled = False
                 return
+            self._get_display_frame = self.apply_alignment
             # ✅ STATUS BAR
             self.status_message.emit("Image alignment enabled", 0)
         else:
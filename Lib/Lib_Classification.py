@@ -1,12 +1,13 @@
 from PySide6.QtWidgets import QWidget, QFileDialog, QMessageBox, QAbstractItemView
-from PySide6.QtCore import Qt, Slot, Signal
+from PySide6.QtCore import Qt, Slot, Signal, QTimer, QCoreApplication
 from PySide6.QtGui import QImage, QPixmap, QShowEvent
 import numpy as np
 import cv2
 import os
 
 from UI.ui_Classification import Ui_Form
-from Core.Core_Classifier import CoreClassifier
+from Core.Core_Classifier import CoreClassifier, ClassificationThread, INVALID_LABEL
+from Core.Core_ClassKernels import apply_palette
 from Core.Core_RawImageSave import CoreRawImageSave
 
 class ClassificationTab(QWidget):
@@ -22,10 +23,21 @@ class ClassificationTab(QWidget):
         self.raster_calculation_tab = None
         self.classifier = CoreClassifier()
         self.current_classification_map = None
+        # _summarize_labels() of current_classification_map (valid mask, classes, counts)
+        self.current_summary = None
         
         if hasattr(self.classifier, "status_message"):
             self.classifier.status_message.connect(self.status_message)
         
+        # predict() runs on a worker thread; results come back via signal.
+        # While a job is running the shared feature matrix is not rebuilt.
+        self.classify_thread = ClassificationThread(self.classifier)
+        self.classify_thread.classified.connect(self._on_classification_ready)
+        self.classify_thread.start()
+        QCoreApplication.instance().aboutToQuit.connect(self.classify_thread.stop)
+        self._classify_busy = False
+        self._auto_pending = False
+        
         # Model loading
         self.ui.model_open_dir.clicked.connect(self.select_model_file)
         self.ui.model_load.clicked.connect(self.load_model_file)
@@ -39,8 +51,28 @@ class ClassificationTab(QWidget):
         # Auto-classify checkbox
         self.ui.class_en_segment_2.setToolTip("Automatically reclassify when camera updates")
         
+        # Reflectance updates only arm this timer; bursts collapse into one
+        # classification of the latest frame once the event loop is free
+        self._auto_timer = QTimer(self)
+        self._auto_timer.setSingleShot(True)
+        self._auto_timer.setInterval(0)
+        self._auto_timer.timeout.connect(self._do_auto_classify)
+        
         # ✅ Colorcet Glasbey Light colormap (256 distinct colors for categorical data)
         self.glasbey_colors = self.get_glasbey_light_colors()
+        # Same palette as an (N, 3) RGB lookup table for the class map display
+        self.glasbey_palette_rgb = np.asarray(self.glasbey_colors, dtype=np.uint8)
+        # Classifier input reused across frames: (feature names, H, W) key and
+        # the (H*W, F) float32 matrix; every column is refilled on each call
+        self._feature_key = None
+        self._feature_X = None
+        # Legend: swatch image keyed by class set, and the key (classes, texts,
+        # label size) of what img_legend currently shows
+        self._legend_classes = None
+        self._legend_base = None
+        self._legend_shown_key = None
+        # RGB display buffer for the class map (reused; QImage is built per call)
+        self._class_rgb = None
         
         # Save
         self.classification_saver = CoreRawImageSave()
@@ -55,20 +87,15 @@ class ClassificationTab(QWidget):
     def get_glasbey_light_colors(self):
         """
         Returns Glasbey Light colormap - perceptually distinct colors for classification.
-        256 colors optimized for categorical visualization.
+        256 colors optimized for categorical visualization, as RGB tuples
+        (the order the Format_RGB888 map and legend images are shown in).
         """
         try:
             import colorcet as cc
             # Get glasbey_light palette (256 RGB colors)
             colors_hex = cc.glasbey_light
-            # Convert hex to BGR for OpenCV
-            colors_bgr = []
-            for hex_color in colors_hex:
-                # Remove '#' and convert
-                rgb = tuple(int(hex_color[i:i+2], 16) for i in (1, 3, 5))
-                bgr = (rgb[2], rgb[1], rgb[0])  # RGB to BGR
-                colors_bgr.append(bgr)
-            return colors_bgr
+            # Remove '#' and convert hex to RGB
+            return [tuple(int(hex_color[i:i+2], 16) for i in (1, 3, 5)) for hex_color in colors_hex]
         except ImportError:
             print("⚠️  colorcet not installed. Using fallback colors.")
             print("   Install with: pip install colorcet")
@@ -77,15 +104,14 @@ class ClassificationTab(QWidget):
     
     def generate_fallback_colors(self, n=256):
         """Generate fallback distinct colors if colorcet not available."""
-        colors = []
-        for i in range(n):
-            hue = int((i * 137.508) % 256)  # Golden angle
-            sat = 200
-            val = 230 if i % 2 == 0 else 180
-            hsv = np.uint8([[[hue, sat, val]]])
-            bgr = cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)[0][0]
-            colors.append(tuple(map(int, bgr)))
-        return colors
+        i = np.arange(n)
+        # All n colors as one (1, n, 3) HSV row -> single cvtColor call
+        hsv = np.empty((1, n, 3), dtype=np.uint8)
+        hsv[0, :, 0] = ((i * 137.508) % 256).astype(np.uint8)  # Golden angle
+        hsv[0, :, 1] = 200
+        hsv[0, :, 2] = np.where(i % 2 == 0, 230, 180)
+        rgb = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)[0]
+        return [tuple(map(int, c)) for c in rgb]
     
     def showEvent(self, event: QShowEvent):
         """Refresh feature list when tab becomes visible."""
@@ -173,7 +199,14 @@ class ClassificationTab(QWidget):
         return selected
     
     def build_feature_stack(self, selected_features):
-        """Build feature stack from selected features."""
+        """
+        Build the classifier input from selected features.
+        
+        Returns:
+            (X, (H, W)) with X a C-contiguous float32 (H*W, num_features)
+            sample matrix filled column by column, or None. The X buffer
+            is reused (refilled) while the selection and size stay the same.
+        """
         if not self.raster_calculation_tab:
             print("❌ Raster calculation tab not available")
             return None
@@ -183,6 +216,7 @@ class ClassificationTab(QWidget):
             print("❌ No reflectance data available")
             return None
         
+        feature_names = []
         feature_arrays = []
         
         for feature_name in selected_features:
@@ -196,20 +230,55 @@ class ClassificationTab(QWidget):
                 feature_arrays.append(reflectance_tiles[3])
             else:
                 raster_data = self.raster_calculation_tab.raster_calculator.get_raster(feature_name)
-                if raster_data is not None:
-                    feature_arrays.append(raster_data)
+                if raster_data is None:
+                    continue
+                feature_arrays.append(raster_data)
+            feature_names.append(feature_name)
         
         if not feature_arrays:
             return None
         
-        feature_stack = np.stack(feature_arrays, axis=0)
-        return feature_stack
+        # Samples x features directly (no (F, H, W) stack + transpose copy)
+        H, W = feature_arrays[0].shape
+        key = (tuple(feature_names), H, W)
+        if key != self._feature_key:
+            self._feature_key = key
+            self._feature_X = np.empty((H * W, len(feature_arrays)), dtype=np.float32)
+        
+        # Invariant: X is C-contiguous float32, so predict_classification
+        # hands it to the model without a defensive copy. Each column is
+        # written through an (H, W) view of itself, so strided or float64
+        # sources are cast while copying (no reshape/astype temporaries).
+        # Column order stays the selection order (the model's feature order);
+        # only the copies run in source order - R1..R4 (one stacked
+        # reflectance buffer) first, then rasters as stored
+        raster_order = self.raster_calculation_tab.raster_calculator.get_raster_list()
+        band_names = ("R1", "R2", "R3", "R4")
+        source_rank = [
+            band_names.index(name) if name in band_names else len(band_names) + raster_order.index(name)
+            for name in feature_names
+        ]
+        
+        X = self._feature_X
+        for k in sorted(range(len(feature_arrays)), key=source_rank.__getitem__):
+            np.copyto(X[:, k].reshape(H, W), feature_arrays[k], casting='unsafe')
+        return X, (H, W)
     
     # ========== AUTO-CLASSIFICATION ==========
     
     @Slot()
     def on_reflectance_updated(self):
-        """Called when reflectance is recalculated. Auto-classifies if enabled."""
+        """Called when reflectance is recalculated. Schedules auto-classification."""
+        self._auto_timer.start()
+    
+    @Slot()
+    def _do_auto_classify(self):
+        """Auto-classify the latest reflectance if enabled."""
+        if self._classify_busy:
+            # Picked up again when the running job finishes
+            self._auto_pending = True
+            return
+        
         if not self.ui.class_en_segment_2.isChecked():
             return
         
@@ -225,28 +294,22 @@ class ClassificationTab(QWidget):
         
         print("🔄 Auto-classifying new frame...")
         
-        feature_stack = self.build_feature_stack(selected_features)
-        if feature_stack is None:
-            return
-        
-        label_map = self.classifier.predict_classification(feature_stack)
-        if label_map is None:
+        features = self.build_feature_stack(selected_features)
+        if features is None:
             return
         
-        self.current_classification_map = label_map
-        self.display_classification_map(label_map)
-        
-        num_valid = np.sum(np.isfinite(label_map))
-        unique_classes = np.unique(label_map[np.isfinite(label_map)])
-        self.status_message.emit(
-            f"Auto-classified: {num_valid:,} pixels, {len(unique_classes)} classes", 1500
-        )
+        self._classify_busy = True
+        self.classify_thread.submit(*features, tag=("auto", len(selected_features)))
     
     # ========== CLASSIFICATION ==========
     
     @Slot()
     def apply_classification(self):
         """Apply loaded model to selected features."""
+        if self._classify_busy:
+            self.status_message.emit("Classification already running", 1500)
+            return
+        
         if self.classifier.model is None:
             QMessageBox.warning(self, "No Model", "Please load a classification model first")
             return
@@ -261,8 +324,8 @@ class ClassificationTab(QWidget):
         
         self.status_message.emit(f"Classifying with {len(selected_features)} features", 0)
         
-        feature_stack = self.build_feature_stack(selected_features)
-        if feature_stack is None:
+        features = self.build_feature_stack(selected_features)
+        if features is None:
             QMessageBox.critical(
                 self, "Feature Error",
                 "Failed to build feature stack.\nMake sure reflectance is calculated (Tab 3)."
@@ -271,77 +334,124 @@ class ClassificationTab(QWidget):
         
         # Check feature count
         expected_features = getattr(self.classifier.model, "n_features_in_", None)
-        if expected_features and feature_stack.shape[0] != expected_features:
+        X, image_shape = features
+        if expected_features and X.shape[1] != expected_features:
             reply = QMessageBox.warning(
                 self, "Feature Mismatch",
-                f"⚠️ Model expects {expected_features} features, but you selected {feature_stack.shape[0]}.\n\n"
+                f"⚠️ Model expects {expected_features} features, but you selected {X.shape[1]}.\n\n"
                 f"Continue anyway?",
                 QMessageBox.Yes | QMessageBox.No
             )
             if reply == QMessageBox.No:
                 return
+            # Auto-classification may have started while the dialog was open
+            if self._classify_busy:
+                self.status_message.emit("Classification already running", 1500)
+                return
         
-        label_map = self.classifier.predict_classification(feature_stack)
-        if label_map is None:
-            QMessageBox.critical(self, "Classification Error", "Failed to classify image.\nCheck console for details.")
-            return
-        
-        self.current_classification_map = label_map
-        self.display_classification_map(label_map)
+        self._classify_busy = True
+        self.classify_thread.submit(X, image_shape, tag=("manual", len(selected_features)))
+    
+    @Slot(object, object)
+    def _on_classification_ready(self, label_map, tag):
+        """Display a finished classification (runs on the GUI thread)."""
+        self._classify_busy = False
+        mode, n_features = tag
         
-        num_valid = np.sum(np.isfinite(label_map))
-        unique_classes = np.unique(label_map[np.isfinite(label_map)])
-        self.status_message.emit(
-            f"Classification complete: {num_valid:,} pixels, {len(unique_classes)} classes", 0
-        )
+        if label_map is None:
+            if mode == "manual":
+                QMessageBox.critical(self, "Classification Error", "Failed to classify image.\nCheck console for details.")
+        else:
+            self.current_classification_map = label_map
+            summary = self._summarize_labels(label_map)
+            self.current_summary = summary
+            self.display_classification_map(label_map, summary, smooth=(mode == "manual"))
+            
+            num_valid = summary["total_valid"]
+            unique_classes = summary["unique_classes"]
+            if mode == "auto":
+                self.status_message.emit(
+                    f"Auto-classified: {num_valid:,} pixels, {len(unique_classes)} classes", 1500
+                )
+            else:
+                self.status_message.emit(
+                    f"Classification complete: {num_valid:,} pixels, {len(unique_classes)} classes", 0
+                )
+                
+                QMessageBox.information(
+                    self, "Classification Complete",
+                    f"✅ Classification successful!\n\nFeatures: {n_features}\nPixels: {num_valid:,}\nClasses: {unique_classes}"
+                )
         
-        QMessageBox.information(
-            self, "Classification Complete",
-            f"✅ Classification successful!\n\nFeatures: {len(selected_features)}\nPixels: {num_valid:,}\nClasses: {unique_classes}"
-        )
+        # A reflectance update arrived while busy -> classify the latest frame
+        if self._auto_pending:
+            self._auto_pending = False
+            self._auto_timer.start()
     
     # ========== VISUALIZATION ==========
     
-    def display_classification_map(self, label_map):
-        """Display classification map using Glasbey Light colormap."""
-        if label_map is None:
-            return
+    def _summarize_labels(self, label_map):
+        """
+        Scan a label map once for everything display, legend and status need.
         
-        h, w = label_map.shape
-        valid_mask = np.isfinite(label_map)
+        Returns:
+            dict with valid_mask, unique_classes, counts (pixels per class)
+            and total_valid
+        """
+        valid_mask = label_map != INVALID_LABEL
+        unique_classes, counts = np.unique(label_map[valid_mask], return_counts=True)
+        return {
+            "valid_mask": valid_mask,
+            "unique_classes": unique_classes,
+            "counts": counts,
+            "total_valid": int(counts.sum()),
+        }
+    
+    def display_classification_map(self, label_map, summary=None, smooth=True):
+        """
+        Display classification map using Glasbey Light colormap.
         
-        # Create RGB image
-        rgb = np.zeros((h, w, 3), dtype=np.uint8)
+        Args:
+            label_map: integer label map (H, W)
+            summary: optional result of _summarize_labels for label_map
+            smooth: SmoothTransformation when scaling to the label; live
+                auto-classified frames pass False (FastTransformation)
+        """
+        if label_map is None:
+            return
         
-        # Get unique classes
-        unique_classes = np.unique(label_map[valid_mask])
+        if summary is None:
+            summary = self._summarize_labels(label_map)
         
-        # Assign Glasbey colors to each class
-        for cls in unique_classes:
-            class_mask = (label_map == cls) & valid_mask
-            color_idx = int(cls) % len(self.glasbey_colors)
-            rgb[class_mask] = self.glasbey_colors[color_idx]
+        h, w = label_map.shape
         
-        # Convert RGB to BGR for OpenCV display
-        bgr = cv2.cvtColor(rgb, cv2.COLOR_RGB2BGR)
+        # Glasbey color per pixel in one palette pass (class % palette size),
+        # palette already in RGB order -> no per-class passes, no cvtColor
+        if self._class_rgb is None or self._class_rgb.shape[:2] != (h, w):
+            self._class_rgb = np.empty((h, w, 3), dtype=np.uint8)
+        rgb = apply_palette(label_map, self.glasbey_palette_rgb, INVALID_LABEL, self._class_rgb)
         
         # Display
-        qimg = QImage(bgr.data, w, h, 3 * w, QImage.Format_RGB888)
+        qimg = QImage(rgb.data, w, h, 3 * w, QImage.Format_RGB888)
         pixmap = QPixmap.fromImage(qimg).scaled(
-            self.ui.class_img.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
+            self.ui.class_img.size(), Qt.KeepAspectRatio,
+            Qt.SmoothTransformation if smooth else Qt.FastTransformation
         )
         self.ui.class_img.setPixmap(pixmap)
         
-        self.update_legend(label_map)
+        self.update_legend(label_map, summary)
     
-    def update_legend(self, label_map):
+    def update_legend(self, label_map, summary=None):
         """Create legend showing discrete class colors using Glasbey."""
         if label_map is None:
             return
         
         try:
-            valid_mask = np.isfinite(label_map)
-            unique_classes = np.unique(label_map[valid_mask])
+            if summary is None:
+                summary = self._summarize_labels(label_map)
+            unique_classes = summary["unique_classes"]
+            counts = summary["counts"]
+            total_valid = summary["total_valid"]
             n_classes = len(unique_classes)
             
             if n_classes == 0:
@@ -354,46 +464,58 @@ class ClassificationTab(QWidget):
             text_width = 280
             margin = 20
             
-            total_width = margin + block_width + 15 + text_width + margin
-            total_height = margin + n_classes * (block_height + gap) - gap + margin
+            # Share of valid pixels per class, from the np.unique counts
+            percentages = counts * (100.0 / total_valid) if total_valid > 0 else np.zeros(n_classes)
+            texts = tuple(
+                f"Class {int(cls)}: {int(pixel_count):,} ({percentage:.1f}%)"
+                for cls, pixel_count, percentage in zip(unique_classes, counts, percentages)
+            )
             
-            # Create white background
-            legend_img = np.ones((total_height, total_width, 3), dtype=np.uint8) * 255
+            # Same classes, same numbers, same label size -> already shown
+            classes = tuple(unique_classes.tolist())
+            label_size = self.ui.img_legend.size()
+            shown_key = (classes, texts, label_size.width(), label_size.height())
+            if shown_key == self._legend_shown_key:
+                return
+            
+            # Color swatches only change with the class set -> drawn once
+            if classes != self._legend_classes:
+                total_width = margin + block_width + 15 + text_width + margin
+                total_height = margin + n_classes * (block_height + gap) - gap + margin
+                
+                # Create white background
+                base = np.full((total_height, total_width, 3), 255, dtype=np.uint8)
+                
+                x0, x1 = margin, margin + block_width
+                for i, cls in enumerate(classes):
+                    y0 = margin + i * (block_height + gap)
+                    y1 = y0 + block_height
+                    
+                    # Color block (inclusive corners, like cv2.rectangle) - the
+                    # class's palette row in RGB, legend is shown as RGB888
+                    base[y0:y1 + 1, x0:x1 + 1] = self.glasbey_palette_rgb[
+                        int(cls) % len(self.glasbey_palette_rgb)
+                    ]
+                    
+                    # 2 px black border centred on the block edge
+                    base[y0 - 1:y0 + 1, x0 - 1:x1 + 2] = 0
+                    base[y1:y1 + 2, x0 - 1:x1 + 2] = 0
+                    base[y0 - 1:y1 + 2, x0 - 1:x0 + 1] = 0
+                    base[y0 - 1:y1 + 2, x1:x1 + 2] = 0
+                
+                self._legend_base = base
+                self._legend_classes = classes
+            
+            legend_img = self._legend_base.copy()
             
             font = cv2.FONT_HERSHEY_SIMPLEX
             font_scale = 0.7
             font_thickness = 1
             
-            for i, cls in enumerate(unique_classes):
+            for i, text in enumerate(texts):
                 y_start = margin + i * (block_height + gap)
                 
-                # Get Glasbey color for this class
-                color_idx = int(cls) % len(self.glasbey_colors)
-                color = self.glasbey_colors[color_idx]
-                
-                # Draw color block
-                cv2.rectangle(
-                    legend_img,
-                    (margin, y_start),
-                    (margin + block_width, y_start + block_height),
-                    color, -1
-                )
-                
-                # Draw border
-                cv2.rectangle(
-                    legend_img,
-                    (margin, y_start),
-                    (margin + block_width, y_start + block_height),
-                    (0, 0, 0), 2
-                )
-                
-                # Count pixels
-                pixel_count = np.sum(label_map[valid_mask] == cls)
-                total_valid = np.sum(valid_mask)
-                percentage = (pixel_count / total_valid * 100) if total_valid > 0 else 0
-                
                 # Draw text
-                text = f"Class {int(cls)}: {pixel_count:,} ({percentage:.1f}%)"
                 text_x = margin + block_width + 15
                 text_y = y_start + block_height // 2 + 8
                 
@@ -403,9 +525,10 @@ class ClassificationTab(QWidget):
             h, w = legend_img.shape[:2]
             qimg = QImage(legend_img.data, w, h, 3 * w, QImage.Format_RGB888)
             pixmap = QPixmap.fromImage(qimg).scaled(
-                self.ui.img_legend.size(), Qt.KeepAspectRatio, Qt.SmoothTransformation
+                label_size, Qt.KeepAspectRatio, Qt.SmoothTransformation
             )
             self.ui.img_legend.setPixmap(pixmap)
+            self._legend_shown_key = shown_key
             
         except Exception as e:
             print(f"❌ Legend creation error: {e}")
@@ -415,14 +538,14 @@ class ClassificationTab(QWidget):
     def on_colormap_changed(self, colormap_name):
         """Update display when colormap changes."""
         if self.current_classification_map is not None:
-            self.display_classification_map(self.current_classification_map)
+            self.display_classification_map(self.current_classification_map, self.current_summary)
             self.status_message.emit(f"Colormap: {colormap_name}", 0)
 
     @Slot()
     def on_vis_range_changed(self):
         """Update display when vmin/vmax changes."""
         if self.current_classification_map is not None:
-            self.display_classification_map(self.current_classification_map)
+            self.display_classification_map(self.current_classification_map, self.current_summary)
 
     # ========== SAVE ==========
 
@@ -443,7 +566,7 @@ class ClassificationTab(QWidget):
             return
 
         classification_image = self.convert_classification_to_image(
-            self.current_classification_map
+            self.current_classification_map, self.current_summary
         )
         if classification_image is None:
             return
@@ -465,22 +588,29 @@ class ClassificationTab(QWidget):
         else:
             QMessageBox.critical(self, "Save Error", "Failed to save classification")
 
-    def convert_classification_to_image(self, label_map):
+    def convert_classification_to_image(self, label_map, summary=None):
         """Convert classification map to normalized uint8 image."""
         if label_map is None:
             return None
 
-        valid_mask = np.isfinite(label_map)
-        valid_values = label_map[valid_mask]
+        if summary is None:
+            summary = self._summarize_labels(label_map)
+        valid_mask = summary["valid_mask"]
+        unique_classes = summary["unique_classes"]
 
-        if valid_values.size == 0:
+        if unique_classes.size == 0:
             return np.zeros_like(label_map, dtype=np.uint8)
 
-        vmin, vmax = np.min(valid_values), np.max(valid_values)
-        norm = (
-            np.where(valid_mask, (label_map - vmin) / (vmax - vmin) * 255.0, 0)
-            if vmax > vmin
-            else np.zeros_like(label_map)
-        )
+        # np.unique output is sorted -> range without another scan
+        vmin, vmax = unique_classes[0], unique_classes[-1]
+        if vmax <= vmin:
+            return np.zeros_like(label_map, dtype=np.uint8)
+
+        # One float32 buffer, normalized in place (subtract in float32 so
+        # narrow integer labels cannot wrap), invalid pixels cleared last
+        norm = np.subtract(label_map, vmin, dtype=np.float32)
+        norm /= float(vmax - vmin)
+        norm *= 255.0
+        norm[~valid_mask] = 0
 
         return norm.astype(np.uint8)
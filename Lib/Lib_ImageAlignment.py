@@ -1,14 +1,73 @@
 from PySide6.QtWidgets import QDialog, QFileDialog, QMessageBox, QTableWidgetItem
-from PySide6.QtCore import Qt, Slot, Signal
-from PySide6.QtGui import QImage, QPixmap
+from PySide6.QtCore import Qt, Slot, Signal, QPointF, QRectF, QTimer
+from PySide6.QtGui import QImage, QPixmap, QPainter, QPen, QColor
 import numpy as np
 import cv2
 import os
-import seaborn as sns
 
 from UI.ui_ImageAlignment import Ui_Dialog
 from Core.Core_GeoTransform import CoreGeoTransform
 
+
+def _disk_offsets(r_min2, r_max2, r):
+    """(K, 2) integer (dy, dx) offsets with r_min2 <= dy^2 + dx^2 <= r_max2."""
+    dy, dx = np.mgrid[-r:r + 1, -r:r + 1]
+    d2 = dy * dy + dx * dx
+    keep = (d2 >= r_min2) & (d2 <= r_max2)
+    return np.stack([dy[keep], dx[keep]], axis=1)
+
+
+# Match markers: filled radius-4 dot inside a 1 px white radius-5 ring
+_MATCH_DOT = _disk_offsets(0, 4 ** 2, 4)
+_MATCH_RING = _disk_offsets(4.5 ** 2, 5.5 ** 2, 5)
+_WHITE = np.array([255, 255, 255], dtype=np.uint8)
+
+
+def _stamp_points(img, pts, offsets, colors):
+    """
+    Paint a stencil of pixel offsets around each point in one fancy-indexed write.
+    
+    Args:
+        img: (H, W, 3) uint8 image, modified in place
+        pts: (N, 2) int32 (x, y) pixel centres
+        offsets: (K, 2) int (dy, dx) stencil
+        colors: (N, 3) or (3,) uint8 colour(s)
+    """
+    h, w = img.shape[:2]
+    ys = pts[:, 1, None] + offsets[:, 0]
+    xs = pts[:, 0, None] + offsets[:, 1]
+    inside = (ys >= 0) & (ys < h) & (xs >= 0) & (xs < w)
+    colors = np.broadcast_to(np.reshape(colors, (-1, 1, 3)), ys.shape + (3,))
+    img[ys[inside], xs[inside]] = colors[inside]
+
+
+def _label_to_image(label, pixmap, pos, iw, ih):
+    """
+    Map a click on a label showing a centred, aspect-scaled pixmap to
+    pixel coordinates of the iw x ih image behind that pixmap.
+    
+    Args:
+        label: QLabel that received the click
+        pixmap: pixmap currently shown on the label
+        pos: click position in label coordinates (QPoint)
+        iw, ih: size of the image the pixmap was scaled from
+    
+    Returns:
+        (x, y) clamped to the image, or None if the click is outside the pixmap
+    """
+    pw, ph = pixmap.width(), pixmap.height()
+    
+    # Position relative to pixmap (pixmap is centered in label)
+    px = pos.x() - (label.width() - pw) // 2
+    py = pos.y() - (label.height() - ph) // 2
+    if px < 0 or py < 0 or px >= pw or py >= ph:
+        return None
+    
+    x = int(px * (iw / pw))
+    y = int(py * (ih / ph))
+    return max(0, min(x, iw - 1)), max(0, min(y, ih - 1))
+
+
 class ImageAlignmentDialog(QDialog):
     """
     Image alignment dialog for multi-band camera alignment.
@@ -17,6 +76,10 @@ class ImageAlignmentDialog(QDialog):
     # ✅ NEW: Signal for status messages (forwarded to main window)
     status_message = Signal(str, int)  # (message, timeout_ms)
     
+    # Match marker colours (uint8 triplets), built on first use
+    MATCH_COLORS = 50
+    _match_palette = None
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.ui = Ui_Dialog()
@@ -30,6 +93,23 @@ class ImageAlignmentDialog(QDialog):
         # Store raw band images (4 bands, 640x480 each)
         self.band_images = [None, None, None, None]
         
+        # Scaled band / zoom pixmaps without overlays: (key, QPixmap, smooth) per band
+        self._base_full = [None, None, None, None]
+        self._base_zoom = [None, None, None, None]
+        
+        # Flat uint8 BGRA staging buffers the bases are converted into,
+        # allocated once per band in load_images
+        self._full_bgra = [None, None, None, None]
+        self._zoom_bgra = [None, None, None, None]
+        
+        # Clicks rescale with FastTransformation; once input is idle for
+        # 80 ms the bases are rebuilt with SmoothTransformation
+        self._quality_timer = QTimer(self)
+        self._quality_timer.setSingleShot(True)
+        self._quality_timer.setInterval(80)
+        self._quality_timer.timeout.connect(self._rerender_smooth)
+        self._rough_bands = set()
+        
         # Full frame labels (one per camera)
         self.full_labels = [
             self.ui.label_2,  # CAM 1
@@ -130,6 +210,10 @@ class ImageAlignmentDialog(QDialog):
             return
         
         self.band_images = images
+        self._base_full = [None, None, None, None]
+        self._base_zoom = [None, None, None, None]
+        self._full_bgra = [np.empty(img.shape[0] * img.shape[1] * 4, np.uint8) for img in images]
+        self._zoom_bgra = [np.empty(self.zoom_size * self.zoom_size * 4, np.uint8) for _ in images]
         
         # Initialize bounding box centers at image center
         h, w = images[0].shape[:2]
@@ -149,49 +233,99 @@ class ImageAlignmentDialog(QDialog):
    
     # ---------- Drawing full frame with box + crosshair ----------
 
-    def update_full_frame(self, band_idx):
+    @staticmethod
+    def _ndarray_to_scaled_pixmap(img, target_size, mode=Qt.SmoothTransformation, staging=None):
+        """
+        Grey or RGB ndarray -> QPixmap scaled to target_size (aspect kept).
+        
+        Pixels are expanded to 4 bytes (BGRA == 0xAARRGGBB words on
+        little-endian, i.e. QImage.Format_RGB32), Qt's native pixmap
+        format: fromImage needs no format conversion and the scaler runs
+        on aligned 32-bit pixels instead of packed RGB888.
+        
+        The QImage wraps the (contiguous) array without copying; the one
+        copy happens in QPixmap.fromImage, so the array need not outlive
+        this call. That also lets callers pass a reusable flat uint8
+        staging buffer (>= h*w*4 bytes) to convert into instead of
+        allocating one per call.
+        """
+        code = cv2.COLOR_GRAY2BGRA if img.ndim == 2 else cv2.COLOR_RGB2BGRA
+        h, w = img.shape[:2]
+        if staging is not None and staging.size >= h * w * 4:
+            bgra = cv2.cvtColor(img, code, dst=staging[:h * w * 4].reshape(h, w, 4))
+        else:
+            bgra = cv2.cvtColor(img, code)
+        qimg = QImage(bgra.data, w, h, bgra.strides[0], QImage.Format_RGB32)
+        return QPixmap.fromImage(qimg).scaled(target_size, Qt.KeepAspectRatio, mode)
+
+    def _scaled_band_pixmap(self, img, size, smooth=True, staging=None):
+        """Band (grey or RGB) -> QPixmap scaled to size, aspect ratio kept."""
+        mode = Qt.SmoothTransformation if smooth else Qt.FastTransformation
+        return self._ndarray_to_scaled_pixmap(img, size, mode, staging)
+
+    def _base_pixmap(self, cache, band_idx, key, img, size, smooth, staging=None):
+        """
+        Cached scaled pixmap for key; a fast (nearest) entry is only reused
+        when no smooth one is asked for.
+        """
+        cached = cache[band_idx]
+        if cached is None or cached[0] != key or (smooth and not cached[2]):
+            cached = (key, self._scaled_band_pixmap(img, size, smooth, staging), smooth)
+            cache[band_idx] = cached
+        return cached[1]
+
+    @Slot()
+    def _rerender_smooth(self):
+        """Redraw the clicked bands with smooth scaling after interaction stopped."""
+        for i in sorted(self._rough_bands):
+            self.update_full_frame(i)
+            self.update_zoom_frame(i)
+        self._rough_bands.clear()
+
+    def update_full_frame(self, band_idx, smooth=True):
         img = self.band_images[band_idx]
         if img is None:
             return
 
-        # Make RGB copy
-        if img.ndim == 2:
-            rgb = cv2.cvtColor(img, cv2.COLOR_GRAY2RGB)
-        else:
-            rgb = img.copy()
+        # Scaled band is cached per label size; only the overlay is redrawn
+        label = self.full_labels[band_idx]
+        size = label.size()
+        key = (size.width(), size.height())
+        pixmap = self._base_pixmap(
+            self._base_full, band_idx, key, img, size, smooth, self._full_bgra[band_idx]
+        ).copy()
 
-        # Draw red bounding box + green crosshair at box center
+        # Red bounding box + green crosshair, in pixmap coordinates
         x, y = self.box_centers[band_idx]
         half = self.zoom_size // 2
         h, w = img.shape[:2]
+        s = pixmap.width() / w
 
         x1 = max(0, x - half)
         y1 = max(0, y - half)
         x2 = min(w, x + half)
         y2 = min(h, y + half)
 
+        painter = QPainter(pixmap)
+        
         # Red box
-        cv2.rectangle(rgb, (x1, y1), (x2 - 1, y2 - 1), (255, 0, 0), 2)
+        painter.setPen(QPen(QColor(255, 0, 0), 2))
+        painter.drawRect(QRectF(x1 * s, y1 * s, (x2 - x1) * s, (y2 - y1) * s))
         
         # Green crosshair at final selected position (if different from center)
         if self.final_positions[band_idx] is not None:
             fx, fy = self.final_positions[band_idx]
-            cv2.drawMarker(rgb, (fx, fy), (0, 255, 0), cv2.MARKER_CROSS, 20, 2)
-
-        # Convert to QPixmap scaled to label size
-        h_rgb, w_rgb = rgb.shape[:2]
-        bytes_per_line = 3 * w_rgb
-        qimg = QImage(rgb.data, w_rgb, h_rgb, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qimg).scaled(
-            self.full_labels[band_idx].size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
-        self.full_labels[band_idx].setPixmap(pixmap)
+            cx, cy, r = (fx + 0.5) * s, (fy + 0.5) * s, 10 * s
+            painter.setPen(QPen(QColor(0, 255, 0), 2))
+            painter.drawLine(QPointF(cx - r, cy), QPointF(cx + r, cy))
+            painter.drawLine(QPointF(cx, cy - r), QPointF(cx, cy + r))
+        
+        painter.end()
+        label.setPixmap(pixmap)
 
     # ---------- Drawing zoom (100x100 ROI) ----------
 
-    def update_zoom_frame(self, band_idx):
+    def update_zoom_frame(self, band_idx, smooth=True):
         img = self.band_images[band_idx]
         if img is None:
             return
@@ -205,28 +339,30 @@ class ImageAlignmentDialog(QDialog):
         x2 = min(w, x + half)
         y2 = min(h, y + half)
 
-        roi = img[y1:y2, x1:x2].copy()
-        if roi.ndim == 2:
-            rgb = cv2.cvtColor(roi, cv2.COLOR_GRAY2RGB)
-        else:
-            rgb = roi.copy()
+        # Scaled ROI is cached until the box moves or the label is resized;
+        # a zoom click only redraws the crosshair
+        label = self.zoom_labels[band_idx]
+        size = label.size()
+        key = (x1, y1, x2, y2, size.width(), size.height())
+        pixmap = self._base_pixmap(
+            self._base_zoom, band_idx, key, img[y1:y2, x1:x2], size, smooth, self._zoom_bgra[band_idx]
+        )
 
         # Draw green crosshair at clicked position in zoom (if clicked)
         if self.zoom_click_positions[band_idx] is not None:
             zx, zy = self.zoom_click_positions[band_idx]
             # Ensure crosshair is within ROI bounds
-            if 0 <= zx < rgb.shape[1] and 0 <= zy < rgb.shape[0]:
-                cv2.drawMarker(rgb, (zx, zy), (0, 255, 0), cv2.MARKER_CROSS, 5, 1)
-
-        h_rgb, w_rgb = rgb.shape[:2]
-        bytes_per_line = 3 * w_rgb
-        qimg = QImage(rgb.data, w_rgb, h_rgb, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qimg).scaled(
-            self.zoom_labels[band_idx].size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
-        self.zoom_labels[band_idx].setPixmap(pixmap)
+            if 0 <= zx < x2 - x1 and 0 <= zy < y2 - y1:
+                pixmap = pixmap.copy()
+                s = pixmap.width() / (x2 - x1)
+                cx, cy, r = (zx + 0.5) * s, (zy + 0.5) * s, 2.5 * s
+                painter = QPainter(pixmap)
+                painter.setPen(QPen(QColor(0, 255, 0), max(1.0, s)))
+                painter.drawLine(QPointF(cx - r, cy), QPointF(cx + r, cy))
+                painter.drawLine(QPointF(cx, cy - r), QPointF(cx, cy + r))
+                painter.end()
+
+        label.setPixmap(pixmap)
 
     # ---------- Mouse interaction ----------
 
@@ -246,28 +382,12 @@ class ImageAlignmentDialog(QDialog):
         if pixmap is None:
             return
 
-        # Position in label
-        lx, ly = event.pos().x(), event.pos().y()
-        lw, lh = label.width(), label.height()
-        pw, ph = pixmap.width(), pixmap.height()
-
-        # Compute offsets (pixmap centered in label)
-        off_x = (lw - pw) // 2
-        off_y = (lh - ph) // 2
-
-        # Position relative to pixmap
-        px = lx - off_x
-        py = ly - off_y
-
-        if px < 0 or py < 0 or px >= pw or py >= ph:
-            return
-
+        # Label coords → image coords
         ih, iw = img.shape[:2]
-        scale_x = iw / pw
-        scale_y = ih / ph
-
-        orig_x = int(px * scale_x)
-        orig_y = int(py * scale_y)
+        hit = _label_to_image(label, pixmap, event.pos(), iw, ih)
+        if hit is None:
+            return
+        orig_x, orig_y = hit
 
         # Update bounding box center for this band
         self.box_centers[band_idx] = (orig_x, orig_y)
@@ -278,9 +398,11 @@ class ImageAlignmentDialog(QDialog):
         # Initialize final position at box center
         self.final_positions[band_idx] = (orig_x, orig_y)
 
-        # Redraw box + zoom
-        self.update_full_frame(band_idx)
-        self.update_zoom_frame(band_idx)
+        # Redraw box + zoom (fast now, smooth once clicking stops)
+        self.update_full_frame(band_idx, smooth=False)
+        self.update_zoom_frame(band_idx, smooth=False)
+        self._rough_bands.add(band_idx)
+        self._quality_timer.start()
         
         # print(f"👆 Band {band_idx+1} box moved to ({orig_x}, {orig_y})")
 
@@ -297,23 +419,6 @@ class ImageAlignmentDialog(QDialog):
         if pixmap is None:
             return
         
-        # Get click position in label
-        lx, ly = event.pos().x(), event.pos().y()
-        lw, lh = label.width(), label.height()
-        pw, ph = pixmap.width(), pixmap.height()
-        
-        # Compute offsets (pixmap is centered in label)
-        off_x = (lw - pw) // 2
-        off_y = (lh - ph) // 2
-        
-        # Position relative to pixmap
-        px = lx - off_x
-        py = ly - off_y
-        
-        # Check if click is within pixmap bounds
-        if px < 0 or py < 0 or px >= pw or py >= ph:
-            return
-        
         # Get bounding box coordinates in original image
         box_x, box_y = self.box_centers[band_idx]
         half = self.zoom_size // 2
@@ -329,17 +434,11 @@ class ImageAlignmentDialog(QDialog):
         zoom_h = y2 - y1
         
         # ✅ FIX: Scale from PIXMAP coords → ROI coords
-        # Pixmap is scaled version of ROI, so we need ROI/pixmap ratio
-        scale_x = zoom_w / float(pw)
-        scale_y = zoom_h / float(ph)
-        
-        # Convert pixmap click position to ROI coordinates
-        zoom_x = int(px * scale_x)
-        zoom_y = int(py * scale_y)
-        
-        # Clamp to ROI bounds
-        zoom_x = max(0, min(zoom_x, zoom_w - 1))
-        zoom_y = max(0, min(zoom_y, zoom_h - 1))
+        # Pixmap is scaled version of ROI (clamped to ROI bounds)
+        hit = _label_to_image(label, pixmap, event.pos(), zoom_w, zoom_h)
+        if hit is None:
+            return
+        zoom_x, zoom_y = hit
         
         # Store zoom click position (relative to zoom ROI)
         self.zoom_click_positions[band_idx] = (zoom_x, zoom_y)
@@ -354,12 +453,14 @@ class ImageAlignmentDialog(QDialog):
         
         self.final_positions[band_idx] = (final_x, final_y)
         
-        # Redraw zoom and full frame
-        self.update_zoom_frame(band_idx)
-        self.update_full_frame(band_idx)
+        # Redraw zoom and full frame (fast now, smooth once clicking stops)
+        self.update_zoom_frame(band_idx, smooth=False)
+        self.update_full_frame(band_idx, smooth=False)
+        self._rough_bands.add(band_idx)
+        self._quality_timer.start()
         
         # Debug output (optional)
-        # print(f"🎯 Band {band_idx+1}: Click ({px},{py}) → ROI ({zoom_x},{zoom_y}) → Image ({final_x},{final_y})")
+        # print(f"🎯 Band {band_idx+1}: Click → ROI ({zoom_x},{zoom_y}) → Image ({final_x},{final_y})")
 
     # ---------- Manual point addition ----------
 
@@ -385,10 +486,13 @@ class ImageAlignmentDialog(QDialog):
         self.manual_points.append(point)
         row = len(self.manual_points) - 1
         
-        # Add to table
+        # Add to table (grow past the designer's 50 placeholder rows if needed)
+        table = self.ui.tableWidget
+        if row >= table.rowCount():
+            table.setRowCount(row + 1)
         for col, band in enumerate(["B1", "B2", "B3", "B4"]):
             x, y = point[band]
-            self.ui.tableWidget.setItem(row, col, QTableWidgetItem(f"{y} {x}"))
+            table.setItem(row, col, QTableWidgetItem(f"{y} {x}"))
         
         # ✅ STATUS MESSAGE
         self.status_message.emit(f"Point {row+1} added to correspondence table", 0)
@@ -461,10 +565,9 @@ class ImageAlignmentDialog(QDialog):
         if not matches_info:
             return
         
-        # Generate distinct colors
-        num_colors = 50
-        colors_rgb = sns.color_palette("husl", n_colors=num_colors)
-        glasbey_colors = [(int(c[2]*255), int(c[1]*255), int(c[0]*255)) for c in colors_rgb]
+        # Distinct colors (cached LUT)
+        num_colors = self.MATCH_COLORS
+        glasbey_colors = self._get_match_palette()
         
         # Process each band pair
         for band_idx in [1, 2, 3]:
@@ -481,32 +584,28 @@ class ImageAlignmentDialog(QDialog):
             if not good_matches or len(kp1) == 0 or len(kp2) == 0:
                 continue
             
-            # Get images
-            img_ref = self.band_images[0].copy()
-            img_target = self.band_images[band_idx].copy()
-            
-            # Convert to RGB
-            if img_ref.ndim == 2:
-                img_ref = cv2.cvtColor(img_ref, cv2.COLOR_GRAY2RGB)
-            if img_target.ndim == 2:
-                img_target = cv2.cvtColor(img_target, cv2.COLOR_GRAY2RGB)
+            # Get images as RGB (cvtColor already returns a new array)
+            img_ref = self.band_images[0]
+            img_target = self.band_images[band_idx]
+            img_ref = cv2.cvtColor(img_ref, cv2.COLOR_GRAY2RGB) if img_ref.ndim == 2 else img_ref.copy()
+            img_target = cv2.cvtColor(img_target, cv2.COLOR_GRAY2RGB) if img_target.ndim == 2 else img_target.copy()
             
             try:
                 # Limit to 50 best matches
                 best_matches = sorted(good_matches, key=lambda x: x.distance)[:num_colors]
                 
-                # Draw circles with distinct colors
-                for idx, match in enumerate(best_matches):
-                    if match.trainIdx < len(kp1) and match.queryIdx < len(kp2):
-                        pt1 = tuple(map(int, kp1[match.trainIdx].pt))
-                        pt2 = tuple(map(int, kp2[match.queryIdx].pt))
-                        
-                        color = glasbey_colors[idx % len(glasbey_colors)]
-                        
-                        cv2.circle(img_ref, pt1, 4, color, -1)
-                        cv2.circle(img_target, pt2, 4, color, -1)
-                        cv2.circle(img_ref, pt1, 5, (255, 255, 255), 1)
-                        cv2.circle(img_target, pt2, 5, (255, 255, 255), 1)
+                # Draw dots with distinct colors: gather (x, y) once, then
+                # stamp all rings and all dots with one NumPy write each
+                idx = [i for i, m in enumerate(best_matches)
+                       if m.trainIdx < len(kp1) and m.queryIdx < len(kp2)]
+                if idx:
+                    pts1 = np.array([kp1[best_matches[i].trainIdx].pt for i in idx]).astype(np.int32)
+                    pts2 = np.array([kp2[best_matches[i].queryIdx].pt for i in idx]).astype(np.int32)
+                    colors = glasbey_colors[np.asarray(idx) % len(glasbey_colors)]
+                    
+                    for img, pts in ((img_ref, pts1), (img_target, pts2)):
+                        _stamp_points(img, pts, _MATCH_RING, _WHITE)
+                        _stamp_points(img, pts, _MATCH_DOT, colors)
                 
                 # Display images
                 self.display_rgb_on_label(img_ref, self.full_labels[0])
@@ -527,21 +626,31 @@ class ImageAlignmentDialog(QDialog):
                 )
                 continue
     
+    @classmethod
+    def _get_match_palette(cls):
+        """
+        Lazily build the husl match-marker palette once per process.
+        
+        seaborn (and matplotlib behind it) is imported here rather than at
+        module level so opening the dialog does not pay for it.
+        
+        Returns:
+            (MATCH_COLORS, 3) uint8 array
+        """
+        if cls._match_palette is None:
+            import seaborn as sns
+            colors_rgb = sns.color_palette("husl", n_colors=cls.MATCH_COLORS)
+            cls._match_palette = np.array(
+                [(int(b*255), int(g*255), int(r*255)) for (r, g, b) in colors_rgb], dtype=np.uint8
+            )
+        return cls._match_palette
+    
     def display_rgb_on_label(self, rgb_img, label):
         """Helper to display RGB image on a QLabel."""
         if rgb_img is None or rgb_img.size == 0:
             return
         
-        h, w = rgb_img.shape[:2]
-        bytes_per_line = 3 * w
-        rgb_img = np.ascontiguousarray(rgb_img)
-        qimg = QImage(rgb_img.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        pixmap = QPixmap.fromImage(qimg).scaled(
-            label.size(),
-            Qt.KeepAspectRatio,
-            Qt.SmoothTransformation,
-        )
-        label.setPixmap(pixmap)
+        label.setPixmap(self._ndarray_to_scaled_pixmap(rgb_img, label.size()))
     
     @Slot()
     def calculate_manual_transformation(self):
@@ -606,10 +715,7 @@ class ImageAlignmentDialog(QDialog):
         
         if reply == QMessageBox.Yes:
             self.manual_points = []
-            
-            for row in range(self.ui.tableWidget.rowCount()):
-                for col in range(self.ui.tableWidget.columnCount()):
-                    self.ui.tableWidget.setItem(row, col, None)
+            self._rebuild_points_table()
             
             self.ui.textBrowser.clear()
             
@@ -649,17 +755,32 @@ class ImageAlignmentDialog(QDialog):
             del self.manual_points[current_row]
             
             # Clear and rebuild table
-            for row in range(self.ui.tableWidget.rowCount()):
-                for col in range(self.ui.tableWidget.columnCount()):
-                    self.ui.tableWidget.setItem(row, col, None)
+            self._rebuild_points_table()
             
+            # ✅ STATUS MESSAGE
+            self.status_message.emit(f"Point {current_row + 1} deleted", 0)
+    
+    def _rebuild_points_table(self):
+        """
+        Refill the correspondence table from self.manual_points in one batch.
+        
+        clearContents() drops all items in a single call (rows and headers
+        stay); signals and repaints are suspended while rows are refilled.
+        """
+        table = self.ui.tableWidget
+        table.blockSignals(True)
+        table.setUpdatesEnabled(False)
+        try:
+            table.clearContents()
+            if len(self.manual_points) > table.rowCount():
+                table.setRowCount(len(self.manual_points))
             for row, point in enumerate(self.manual_points):
                 for col, band in enumerate(["B1", "B2", "B3", "B4"]):
                     x, y = point[band]
-                    self.ui.tableWidget.setItem(row, col, QTableWidgetItem(f"{y} {x}"))
-            
-            # ✅ STATUS MESSAGE
-            self.status_message.emit(f"Point {current_row + 1} deleted", 0)
+                    table.setItem(row, col, QTableWidgetItem(f"{y} {x}"))
+        finally:
+            table.setUpdatesEnabled(True)
+            table.blockSignals(False)
     
     @Slot()
     def select_calibration_image(self):
@@ -690,8 +811,11 @@ class ImageAlignmentDialog(QDialog):
             return
         
         try:
-            # Load image
-            full_img = cv2.imread(filepath, cv2.IMREAD_GRAYSCALE)
+            # Load image: decode from a pre-read buffer, skipping EXIF
+            # orientation handling (raw camera frames are never rotated)
+            with open(filepath, 'rb') as f:
+                buf = np.frombuffer(f.read(), np.uint8)
+            full_img = cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE | cv2.IMREAD_IGNORE_ORIENTATION)
             
             if full_img is None:
                 QMessageBox.critical(self, "Load Error", "Failed to load image")
@@ -710,30 +834,16 @@ class ImageAlignmentDialog(QDialog):
                     f"Loading anyway, but results may be incorrect."
                 )
             
-            # Split into 4 bands
+            # Crop / zero-pad the whole image once to 480 x 2560, then split
+            # into 4 bands as (4, 480, 640) views (no per-band copies)
             frame_width = 640
-            images = []
-            
-            for i in range(4):
-                x_start = i * frame_width
-                x_end = (i + 1) * frame_width
-                
-                if x_end <= full_img.shape[1]:
-                    band = full_img[:, x_start:x_end]
-                else:
-                    band = full_img[:, x_start:]
-                    if band.shape[1] < frame_width:
-                        pad_width = frame_width - band.shape[1]
-                        band = np.pad(band, ((0, 0), (0, pad_width)), mode='constant')
-                
-                if band.shape[0] != expected_height:
-                    if band.shape[0] > expected_height:
-                        band = band[:expected_height, :]
-                    else:
-                        pad_height = expected_height - band.shape[0]
-                        band = np.pad(band, ((0, pad_height), (0, 0)), mode='constant')
-                
-                images.append(band)
+            full_img = full_img[:expected_height, :expected_width]
+            pad_h = expected_height - full_img.shape[0]
+            pad_w = expected_width - full_img.shape[1]
+            if pad_h or pad_w:
+                full_img = np.pad(full_img, ((0, pad_h), (0, pad_w)), mode='constant')
+            full_img = np.ascontiguousarray(full_img)
+            images = list(full_img.reshape(expected_height, 4, frame_width).transpose(1, 0, 2))
             
             # Load into dialog
             self.load_images(images)
@@ -750,12 +860,12 @@ class ImageAlignmentDialog(QDialog):
     
     @Slot()
     def select_config_file(self):
-        """Select existing .ini configuration file."""
+        """Select existing .npz / .ini configuration file."""
         filepath, _ = QFileDialog.getOpenFileName(
             self,
             "Select Configuration File",
             "",
-            "INI Files (*.ini)"
+            "Configuration Files (*.npz *.ini);;NumPy Files (*.npz);;INI Files (*.ini)"
         )
         
         if filepath:
@@ -765,14 +875,14 @@ class ImageAlignmentDialog(QDialog):
     
     @Slot()
     def load_config_file(self):
-        """Load transformation from .ini file."""
+        """Load transformation from .npz / .ini file."""
         filepath = self.ui.bg_img_dir_path.text().strip()
         
         if not filepath:
             QMessageBox.warning(self, "No File", "Select a configuration file first")
             return
         
-        results = self.geo_transform.load_config_ini(filepath)
+        results = self.geo_transform.load_config(filepath)
         
         if results is None:
             QMessageBox.critical(self, "Failed", "Failed to load configuration")
@@ -807,7 +917,7 @@ class ImageAlignmentDialog(QDialog):
 
     @Slot()
     def save_configuration(self):
-        """Save current transformation to .ini file."""
+        """Save current transformation to .npz file."""
         folder = self.ui.folder_save_path_3.text().strip()
         
         if not folder:
@@ -838,7 +948,7 @@ class ImageAlignmentDialog(QDialog):
         # Create filename with timestamp
         from datetime import datetime
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filepath = os.path.join(folder, f"alignment_{timestamp}.ini")
+        filepath = os.path.join(folder, f"alignment_{timestamp}.npz")
         
         try:
             # ✅ Make sure H_11 is set (identity matrix for Band 1)
@@ -846,7 +956,7 @@ class ImageAlignmentDialog(QDialog):
                 self.geo_transform.homography_matrices['H_11'] = np.eye(3, dtype=np.float32)
             
             # Save configuration
-            self.geo_transform.save_config_ini(filepath)
+            self.geo_transform.save_config_npz(filepath)
             
             self.status_message.emit(f"Configuration saved: {os.path.basename(filepath)}", 0)
             
@@ -1,6 +1,6 @@
 import sys
 from PySide6.QtWidgets import QApplication, QMainWindow
-from PySide6.QtCore import Slot
+from PySide6.QtCore import Slot, QTimer
 from UI.ui_MainWindow import Ui_MainWindow
 from Lib.Lib_CameraViewer import CameraViewerTab
 from Lib.Lib_Calibration import CalibrationTab
@@ -61,6 +61,13 @@ class MainWindow(QMainWindow):
         # ✅ INITIALIZE STATUS BAR
         self.statusBar().showMessage("Initializing...", 0)
         
+        # Status bar throttle: at most one update per 100 ms, latest wins
+        self._pending_status = None
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(100)
+        self._status_timer.timeout.connect(self._flush_status)
+        
         # Replace empty tabs
         self.ui.main_tab.removeTab(0)
         self.camera_tab = CameraViewerTab(self.ui.main_tab)
@@ -109,5 +116,24 @@ class MainWindow(QMainWindow):
         Args:
             message: Status message to display
             timeout: Display duration in milliseconds (0 = permanent)
+        
+        Messages arriving within 100 ms of the last shown one are coalesced;
+        only the most recent of a burst is displayed.
         """
+        if self._status_timer.isActive():
+            self._pending_status = (message, timeout)
+            return
+        
+        self.statusBar().showMessage(message, timeout)
+        self._status_timer.start()
+    
+    @Slot()
+    def _flush_status(self):
+        """Show the last message held back by the throttle."""
+        if self._pending_status is None:
+            return
+        
+        message, timeout = self._pending_status
+        self._pending_status = None
         self.statusBar().showMessage(message, timeout)
+        self._status_timer.start()
@@ -19,6 +19,8 @@ class RasterCalculationTab(QWidget):
     # ✅ NEW: Signal for status messages
     status_message = Signal(str, int)  # (message, timeout_ms)
     features_update = Signal()
+    # Emitted after current_reflectance_tiles is refreshed. The tiles are views
+    # into buffers reused two calculations later: copy them to keep them longer
     reflectance_calculated = Signal()
 
     def __init__(self, parent=None):
@@ -33,6 +35,7 @@ class RasterCalculationTab(QWidget):
         # === REFLECTANCE CALCULATION ===
         self.reflectance_calculator = CoreReflectanceCalculator()
         self.current_reflectance_tiles = None
+        self._combined_buf = None  # 480x2560 uint8, reused by combine_tiles_to_image
         
         # Reflectance save setup
         self.reflectance_saver = CoreRawImageSave()
@@ -160,14 +163,15 @@ class RasterCalculationTab(QWidget):
                 self.camera_viewer_tab.last_aligned_frame is not None):
                 frame_to_use = self.camera_viewer_tab.last_aligned_frame
             
-            bg_tiles = self.calibration_tab.dark_noise_estimator.bg_tiles
+            # float32 background stack, cast once per loaded background
+            bg_stack = self.calibration_tab.dark_noise_estimator.background_stack_f32()
             expo_sliders = self.camera_viewer_tab.expo_sliders
             ref_cam_entries = self.calibration_tab.ref_cam_entries
             
             # Calculate reflectance
             tiles = self.reflectance_calculator.calculate_reflectance(
                 frame_to_use,
-                bg_tiles,
+                bg_stack,
                 expo_sliders,
                 ref_cam_entries,
                 EXPO_MS
@@ -592,20 +596,30 @@ class RasterCalculationTab(QWidget):
     # ========== HELPER METHODS ==========
     
     def combine_tiles_to_image(self, tiles):
-        """Combine 4 reflectance tiles into 480x2560 image."""
+        """
+        Combine 4 reflectance tiles into 480x2560 image.
+        
+        Each normalized tile is written straight into its column span of a
+        reused buffer (no per-tile uint8 arrays, no hstack); the result is
+        overwritten by the next call.
+        """
         if tiles is None or len(tiles) != 4:
             return None
         
-        combined_list = []
-        for tile in tiles:
+        h, w = tiles[0].shape
+        if self._combined_buf is None or self._combined_buf.shape != (h, 4 * w):
+            self._combined_buf = np.empty((h, 4 * w), dtype=np.uint8)
+        
+        for i, tile in enumerate(tiles):
+            span = self._combined_buf[:, i * w : (i + 1) * w]
             t_min, t_max = np.min(tile), np.max(tile)
             if t_max > t_min:
                 norm = (tile - t_min) / (t_max - t_min) * 255.0
+                np.copyto(span, norm, casting='unsafe')  # same truncation as astype
             else:
-                norm = np.zeros_like(tile)
-            combined_list.append(norm.astype(np.uint8))
+                span.fill(0)
         
-        return np.hstack(combined_list)
+        return self._combined_buf
     
     def convert_raster_to_image(self, raster):
         """Convert single raster (480x640) to normalized uint8 image."""
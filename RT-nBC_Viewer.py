@@ -1,8 +1,11 @@
 import sys
+import logging
 from PySide6 import QtWidgets
 from Lib.Lib_MainWindow import MainWindow
 
 if __name__ == "__main__":
+    # Module diagnostics (e.g. Core_GeoTransform) are DEBUG-level; raise to see them
+    logging.basicConfig(level=logging.WARNING)
     application = QtWidgets.QApplication(sys.argv)
     window = MainWindow()
     window.show()